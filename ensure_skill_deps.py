@@ -2,6 +2,7 @@ import json
 import os
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
 
 CONFIG_PATH = Path(os.getenv("MCP_CONFIG_PATH", str(Path.home() / ".config/Code/User/mcp.json")))
@@ -25,9 +26,10 @@ def iter_skills(paths):
     for base in paths:
         if not base.exists():
             continue
-        for child in base.iterdir():
-            if child.is_dir():
-                yield child
+        with os.scandir(base) as it:
+            for entry in it:
+                if entry.is_dir():
+                    yield Path(entry.path)
 
 
 def find_requirements(skill_dir: Path):
@@ -57,9 +59,28 @@ def main():
         print("No requirements to install.")
         return 0
 
+    # One pip run resolves every skill's requirements together instead of once per skill.
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", delete=False) as tmp:
+        tmp.write("".join(f"-r {req.resolve()}\n" for req in reqs))
+        combined = Path(tmp.name)
+
+    try:
+        print(f"[pip] install -r {combined} ({len(reqs)} skills)")
+        result = subprocess.run([sys.executable, "-m", "pip", "install", "-r", str(combined)], check=False)
+    finally:
+        combined.unlink(missing_ok=True)
+    if result.returncode == 0:
+        return 0
+
+    # One bad pin fails the whole batch; fall back to one run per skill so the rest still install.
+    print("[warn] combined install failed; retrying per skill")
+    failed = []
     for req in reqs:
         print(f"[pip] install -r {req}")
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", str(req)], check=False)
+        if subprocess.run([sys.executable, "-m", "pip", "install", "-r", str(req)], check=False).returncode != 0:
+            failed.append(req.parent.name)
+    if failed:
+        print(f"[warn] requirements failed for: {', '.join(failed)}")
 
     return 0
 
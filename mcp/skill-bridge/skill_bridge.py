@@ -3,10 +3,10 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import binascii
 import json
 import os
 import re
-import subprocess
 import sys
 from pathlib import Path
 from typing import Any
@@ -15,6 +15,11 @@ from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
 from mcp.types import CallToolResult, ImageContent, TextContent, Tool
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class OutputType:
     IMAGE_PNG = "image/png"
@@ -43,15 +48,7 @@ class SkillOutput:
 
 
 def _ordered_unique_paths(values: list[str]) -> list[str]:
-    out: list[str] = []
-    seen: set[str] = set()
-    for raw in values:
-        p = str(Path(raw).expanduser())
-        if not p or p in seen:
-            continue
-        seen.add(p)
-        out.append(p)
-    return out
+    return list(dict.fromkeys(str(Path(v).expanduser()) for v in values if v))
 
 
 def _skills_paths() -> list[str]:
@@ -65,31 +62,73 @@ def _skills_paths() -> list[str]:
     return _ordered_unique_paths(defaults + extra)
 
 
+_DESC_RE = re.compile(rb"^description:[ \t]*(.+?)\s*$", re.MULTILINE | re.IGNORECASE)
+_DESC_HEAD_BYTES = 4096
+_SKILL_MD_CACHE_MAX_BYTES = 64 * 1024
+
+
 def _extract_description(skill_md: Path) -> str:
+    # The description lives in the front-matter, so only the head of the file is parsed.
     try:
-        content = skill_md.read_text(encoding="utf-8")
+        with skill_md.open("rb") as fh:
+            head = fh.read(_DESC_HEAD_BYTES)
     except Exception:
         return ""
-    match = re.search(r"(?mi)^description:\s*(.+)\s*$", content)
+    return _description_from_head(head)
+
+
+def _description_from_head(head: bytes) -> str:
+    head = head[:_DESC_HEAD_BYTES]
+    header = head
+    if head.startswith(b"---"):
+        end = head.find(b"\n---", 3)
+        if end != -1:
+            header = head[:end]
+    match = _DESC_RE.search(header)
     if match:
-        return match.group(1).strip().strip("\"'")
-    for line in content.splitlines():
-        line = line.strip()
+        return match.group(1).decode("utf-8", errors="replace").strip().strip("\"'")
+    for raw in head.splitlines():
+        line = raw.decode("utf-8", errors="replace").strip()
         if line and not line.startswith("#") and not line.startswith("---"):
             return line
     return ""
 
 
+def _list_dir(directory: str | Path) -> dict[str, os.DirEntry[str]]:
+    try:
+        with os.scandir(directory) as it:
+            return {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+
+
+def _pick_script(
+    entries: dict[str, os.DirEntry[str]],
+    preferred: tuple[str, ...],
+    *,
+    fallback: bool = True,
+) -> str | None:
+    for name in preferred:
+        if name in entries:
+            return entries[name].path
+    if not fallback:
+        return None
+    for name in sorted(entries):
+        if name.endswith(".py") and not name.startswith((".", "test_")) and name != "__init__.py":
+            return entries[name].path
+    return None
+
+
 def discover_skills(skills_paths: list[str]) -> dict[str, dict[str, Any]]:
     skills: dict[str, dict[str, Any]] = {}
     for skills_path in skills_paths:
         base = Path(skills_path).expanduser()
-        if not base.exists() or not base.is_dir():
+        try:
+            with os.scandir(base) as it:
+                skill_dirs = [Path(entry.path) for entry in it if entry.is_dir()]
+        except OSError:
             continue
-        for skill_dir in base.iterdir():
-            if not skill_dir.is_dir():
-                continue
-
+        for skill_dir in skill_dirs:
             info: dict[str, Any] = {
                 "name": skill_dir.name,
                 "path": str(skill_dir),
@@ -98,48 +137,59 @@ def discover_skills(skills_paths: list[str]) -> dict[str, dict[str, Any]]:
                 "outputs": ["text/plain"],
             }
 
-            skill_md = skill_dir / "SKILL.md"
-            if skill_md.exists():
-                desc = _extract_description(skill_md)
+            entries = _list_dir(skill_dir)
+            skill_md_entry = entries.get("SKILL.md")
+            if skill_md_entry is not None:
+                # Small SKILL.md files are kept in memory so get_skill_help needs no disk read.
+                desc = ""
+                try:
+                    if skill_md_entry.stat().st_size < _SKILL_MD_CACHE_MAX_BYTES:
+                        raw = Path(skill_md_entry.path).read_bytes()
+                        info["skill_md"] = raw.decode("utf-8")
+                        desc = _description_from_head(raw)
+                    else:
+                        desc = _extract_description(Path(skill_md_entry.path))
+                except Exception:
+                    pass
                 if desc:
                     info["description"] = desc
 
-            for script_name in (
-                "main.py",
-                f"{skill_dir.name}.py",
-                f"{skill_dir.name.replace('-', '_')}.py",
-                "script.py",
-                "run.py",
-            ):
-                cand = skill_dir / script_name
-                if cand.exists():
-                    info["script"] = str(cand)
-                    break
+            info["script"] = _pick_script(
+                entries,
+                (
+                    "main.py",
+                    f"{skill_dir.name}.py",
+                    f"{skill_dir.name.replace('-', '_')}.py",
+                    "script.py",
+                    "run.py",
+                ),
+                fallback=False,
+            )
             if not info["script"]:
-                scripts_dir = skill_dir / "scripts"
-                if scripts_dir.exists() and scripts_dir.is_dir():
-                    for script_name in ("main.py", "run.py"):
-                        cand = scripts_dir / script_name
-                        if cand.exists():
-                            info["script"] = str(cand)
-                            break
-                    if not info["script"]:
-                        for cand in sorted(scripts_dir.glob("*.py")):
-                            if cand.name == "__init__.py" or cand.name.startswith("test_"):
-                                continue
-                            info["script"] = str(cand)
-                            break
+                scripts_entry = entries.get("scripts")
+                if scripts_entry is not None and scripts_entry.is_dir():
+                    info["script"] = _pick_script(_list_dir(scripts_entry.path), ("main.py", "run.py"))
             if not info["script"]:
-                for cand in sorted(skill_dir.glob("*.py")):
-                    if cand.name == "__init__.py" or cand.name.startswith("test_"):
-                        continue
-                    info["script"] = str(cand)
-                    break
+                info["script"] = _pick_script(entries, ())
             if info["script"]:
                 skills[skill_dir.name] = info
     return skills
 
 
+_SKILL_OUT_RE = re.compile(r"SKILL_OUTPUT:([^:]+):(.+)", re.DOTALL)
+_DATA_URI_RE = re.compile(r"data:(image/[^;]+);base64,(.+)", re.DOTALL)
+_IMAGE_MIME_BY_SUFFIX = {
+    ".png": OutputType.IMAGE_PNG,
+    ".jpg": OutputType.IMAGE_JPEG,
+    ".jpeg": OutputType.IMAGE_JPEG,
+    ".gif": OutputType.IMAGE_GIF,
+    ".webp": OutputType.IMAGE_WEBP,
+}
+_IMG_SUFFIXES = tuple(_IMAGE_MIME_BY_SUFFIX)
+_MARKDOWN_LEAD_CHARS = frozenset("#*`-|")
+_MARKDOWN_RE = re.compile(r"^(?:#{1,6}\s|\*\*[^*]+\*\*|```|\s*[-*]\s|\|\s*[^|]+\s*\|)", re.MULTILINE)
+
+
 def detect_and_parse_output(output: Any) -> SkillOutput:
     if isinstance(output, SkillOutput):
         return output
@@ -148,7 +198,7 @@ def detect_and_parse_output(output: Any) -> SkillOutput:
         return SkillOutput(OutputType.PLAIN, "")
 
     if text.startswith("SKILL_OUTPUT:"):
-        match = re.match(r"SKILL_OUTPUT:([^:]+):(.+)", text, re.DOTALL)
+        match = _SKILL_OUT_RE.match(text)
         if match:
             mime_type = match.group(1)
             data = match.group(2)
@@ -162,23 +212,24 @@ def detect_and_parse_output(output: Any) -> SkillOutput:
                     return SkillOutput(mime_type, data, text)
             return SkillOutput(mime_type, data, text)
 
-    data_uri_match = re.match(r"data:(image/[^;]+);base64,(.+)", text, re.DOTALL)
+    data_uri_match = _DATA_URI_RE.match(text)
     if data_uri_match:
         return SkillOutput(data_uri_match.group(1), data_uri_match.group(2), text)
 
-    if len(text) > 100 and re.match(r"^[A-Za-z0-9+/=\s]+$", text[:1000]):
+    if len(text) > 100:
+        # 16 base64 chars decode to the 12 bytes needed to tell PNG/JPEG/GIF/WEBP apart.
         try:
-            decoded = base64.b64decode(text[:100])
-            if decoded.startswith(b"\x89PNG"):
-                return SkillOutput(OutputType.IMAGE_PNG, text, text)
-            if decoded.startswith(b"\xff\xd8\xff"):
-                return SkillOutput(OutputType.IMAGE_JPEG, text, text)
-            if decoded.startswith(b"GIF8"):
-                return SkillOutput(OutputType.IMAGE_GIF, text, text)
-            if decoded.startswith(b"RIFF") and b"WEBP" in decoded[:20]:
-                return SkillOutput(OutputType.IMAGE_WEBP, text, text)
-        except Exception:
-            pass
+            magic = base64.b64decode(text[:16], validate=True)
+        except (binascii.Error, ValueError):
+            magic = b""
+        if magic.startswith(b"\x89PNG"):
+            return SkillOutput(OutputType.IMAGE_PNG, text, text)
+        if magic.startswith(b"\xff\xd8\xff"):
+            return SkillOutput(OutputType.IMAGE_JPEG, text, text)
+        if magic.startswith(b"GIF8"):
+            return SkillOutput(OutputType.IMAGE_GIF, text, text)
+        if magic.startswith(b"RIFF") and magic[8:12] == b"WEBP":
+            return SkillOutput(OutputType.IMAGE_WEBP, text, text)
 
     if (text.startswith("{") and text.endswith("}")) or (text.startswith("[") and text.endswith("]")):
         try:
@@ -186,37 +237,37 @@ def detect_and_parse_output(output: Any) -> SkillOutput:
         except Exception:
             pass
 
-    if any(
-        re.search(pattern, text, re.MULTILINE)
-        for pattern in (r"^#{1,6}\s", r"^\*\*[^*]+\*\*", r"^```", r"^\s*[-*]\s", r"^\|\s*[^|]+\s*\|")
-    ):
+    # On a single (stripped) line the markdown patterns can only match at its first character.
+    if ("\n" in text or text[0] in _MARKDOWN_LEAD_CHARS) and _MARKDOWN_RE.search(text):
         return SkillOutput(OutputType.MARKDOWN, text, text)
 
-    maybe_path = Path(text).expanduser()
-    if maybe_path.exists() and maybe_path.is_file():
-        ext = maybe_path.suffix.lower()
-        mime_map = {
-            ".png": OutputType.IMAGE_PNG,
-            ".jpg": OutputType.IMAGE_JPEG,
-            ".jpeg": OutputType.IMAGE_JPEG,
-            ".gif": OutputType.IMAGE_GIF,
-            ".webp": OutputType.IMAGE_WEBP,
-        }
-        if ext in mime_map:
+    # Only a single short line ending in an image suffix can be a path worth a stat().
+    if "\n" not in text and len(text) < 4096 and text.lower().endswith(_IMG_SUFFIXES):
+        maybe_path = Path(text).expanduser()
+        if maybe_path.is_file():
             try:
                 data = base64.b64encode(maybe_path.read_bytes()).decode("utf-8")
-                return SkillOutput(mime_map[ext], data, text)
+                return SkillOutput(_IMAGE_MIME_BY_SUFFIX[maybe_path.suffix.lower()], data, text)
             except Exception:
                 pass
 
     return SkillOutput(OutputType.PLAIN, text, text)
 
 
+def _dumps_pretty(data: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
 def convert_to_mcp_content(skill_output: SkillOutput) -> list[TextContent | ImageContent]:
     if skill_output.is_image():
         return [ImageContent(type="image", data=skill_output.data, mimeType=skill_output.content_type)]
     if skill_output.is_json():
-        text = json.dumps(skill_output.data, indent=2, ensure_ascii=False)
+        text = _dumps_pretty(skill_output.data)
         return [TextContent(type="text", text=f"```json\n{text}\n```")]
     return [TextContent(type="text", text=str(skill_output.data))]
 
@@ -229,41 +280,155 @@ async def execute_skill(skill: dict[str, Any], args: list[str] | None = None) ->
     if args:
         cmd.extend([str(x) for x in args])
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120,
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             cwd=skill.get("path"),
         )
-        if result.returncode != 0:
-            err = (result.stderr or "").strip() or f"Skill exited with code {result.returncode}"
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=120)
+        except asyncio.TimeoutError:
+            return SkillOutput(OutputType.PLAIN, "Error: Skill execution timed out")
+        finally:
+            # Timed out, or the tool call was cancelled (CancelledError propagates after this):
+            # never leave the skill running.
+            if proc.returncode is None:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                await proc.wait()
+        if proc.returncode != 0:
+            err = stderr.decode("utf-8", errors="replace").strip() or f"Skill exited with code {proc.returncode}"
             return SkillOutput(OutputType.PLAIN, f"Error: {err}")
-        return detect_and_parse_output(result.stdout)
-    except subprocess.TimeoutExpired:
-        return SkillOutput(OutputType.PLAIN, "Error: Skill execution timed out")
+        return detect_and_parse_output(stdout.decode("utf-8", errors="replace"))
     except Exception as exc:
         return SkillOutput(OutputType.PLAIN, f"Error executing skill: {exc}")
 
 
+def _skills_snapshot_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home).expanduser() / "skill-bridge" / "skills.json"
+
+
+def _build_skills_manifest(skills_paths: list[str]) -> list[list[Any]]:
+    # Directory mtimes catch added/removed scripts; SKILL.md stat catches description edits.
+    manifest: list[list[Any]] = []
+    for skills_path in skills_paths:
+        try:
+            it = os.scandir(os.path.expanduser(skills_path))
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                for path in (entry.path, os.path.join(entry.path, "SKILL.md"), os.path.join(entry.path, "scripts")):
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    manifest.append([path, st.st_mtime_ns, st.st_size])
+    manifest.sort()
+    return manifest
+
+
+def _load_skills_snapshot() -> dict[str, Any] | None:
+    try:
+        data = json.loads(_skills_snapshot_path().read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("skills"), dict):
+        return None
+    return data
+
+
+def _write_skills_snapshot(manifest: list[list[Any]], skills: dict[str, dict[str, Any]]) -> None:
+    path = _skills_snapshot_path()
+    tmp = path.with_suffix(".json.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps({"manifest": manifest, "skills": skills}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+
 server = Server("skill-bridge")
 _skills_cache: dict[str, dict[str, Any]] = {}
+# Derived from _skills_cache; rebuilt lazily and dropped whenever the skills change.
+_tools_cache: list[Tool] | None = None
+_list_skills_cache: str | None = None
+
+
+def _set_skills_cache(skills: dict[str, dict[str, Any]]) -> None:
+    global _skills_cache, _tools_cache, _list_skills_cache
+    _skills_cache = skills
+    _tools_cache = None
+    _list_skills_cache = None
 
 
 def get_skills(force_refresh: bool = False) -> dict[str, dict[str, Any]]:
-    global _skills_cache
-    if force_refresh or not _skills_cache:
-        _skills_cache = discover_skills(_skills_paths())
+    if _skills_cache and not force_refresh:
+        return _skills_cache
+    paths = _skills_paths()
+    manifest = _build_skills_manifest(paths)
+    if not force_refresh:
+        snapshot = _load_skills_snapshot()
+        if snapshot is not None and snapshot.get("manifest") == manifest:
+            _set_skills_cache(snapshot["skills"])
+            return _skills_cache
+    _set_skills_cache(discover_skills(paths))
+    _write_skills_snapshot(manifest, _skills_cache)
     return _skills_cache
 
 
 def clear_skills_cache() -> None:
-    global _skills_cache
-    _skills_cache = {}
+    _set_skills_cache({})
+
+
+_SKILLS_POLL_INTERVAL = float(os.environ.get("SKILL_BRIDGE_POLL_INTERVAL", "5"))
+# Last client session seen in a request; used to push tools/list_changed from the watcher.
+_session: Any = None
+
+
+def _remember_session() -> None:
+    global _session
+    try:
+        _session = server.request_context.session
+    except LookupError:
+        pass
+
+
+async def _notify_tools_changed() -> None:
+    if _session is None:
+        return
+    try:
+        await _session.send_tool_list_changed()
+    except Exception:
+        pass
+
+
+async def _watch_skills() -> None:
+    manifest = await asyncio.to_thread(_build_skills_manifest, _skills_paths())
+    while True:
+        await asyncio.sleep(_SKILLS_POLL_INTERVAL)
+        current = await asyncio.to_thread(_build_skills_manifest, _skills_paths())
+        if current == manifest:
+            continue
+        manifest = current
+        clear_skills_cache()
+        await _notify_tools_changed()
 
 
 @server.list_tools()
 async def list_tools() -> list[Tool]:
+    global _tools_cache
+    _remember_session()
+    skills = get_skills(force_refresh=False)
+    if _tools_cache is not None:
+        return _tools_cache
     tools = [
         Tool(
             name="run_skill",
@@ -297,43 +462,48 @@ async def list_tools() -> list[Tool]:
             inputSchema={"type": "object", "properties": {}},
         ),
     ]
-    for skill_name, info in get_skills(force_refresh=True).items():
-        tools.append(
-            Tool(
-                name=f"skill_{skill_name}",
-                description=info.get("description", f"Run {skill_name}"),
-                inputSchema={
-                    "type": "object",
-                    "properties": {"args": {"type": "array", "items": {"type": "string"}}},
-                },
-            )
+    tools.extend(
+        Tool(
+            name=f"skill_{skill_name}",
+            description=info.get("description", f"Run {skill_name}"),
+            inputSchema={
+                "type": "object",
+                "properties": {"args": {"type": "array", "items": {"type": "string"}}},
+            },
         )
+        for skill_name, info in skills.items()
+    )
+    _tools_cache = tools
     return tools
 
 
 @server.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
+    global _list_skills_cache
+    _remember_session()
     skills = get_skills(force_refresh=False)
 
     if name == "refresh_skills":
         clear_skills_cache()
         refreshed = get_skills(force_refresh=True)
+        await _notify_tools_changed()
         return CallToolResult(
             content=[TextContent(type="text", text=f"Skills refreshed. Total: {len(refreshed)}")]
         )
 
     if name == "list_skills":
-        payload = [
-            {
-                "name": skill_name,
-                "description": info.get("description", ""),
-                "outputs": info.get("outputs", ["text/plain"]),
-                "path": info.get("path", ""),
-            }
-            for skill_name, info in sorted(skills.items())
-        ]
-        text = json.dumps(payload, indent=2, ensure_ascii=False)
-        return CallToolResult(content=[TextContent(type="text", text=text)])
+        if _list_skills_cache is None:
+            payload = [
+                {
+                    "name": skill_name,
+                    "description": info.get("description", ""),
+                    "outputs": info.get("outputs", ["text/plain"]),
+                    "path": info.get("path", ""),
+                }
+                for skill_name, info in sorted(skills.items())
+            ]
+            _list_skills_cache = _dumps_pretty(payload)
+        return CallToolResult(content=[TextContent(type="text", text=_list_skills_cache)])
 
     if name == "get_skill_help":
         skill_name = str(arguments.get("skill_name", ""))
@@ -342,6 +512,9 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
             return CallToolResult(
                 content=[TextContent(type="text", text=f"Error: Skill '{skill_name}' not found.")]
             )
+        cached_md = skill.get("skill_md")
+        if cached_md is not None:
+            return CallToolResult(content=[TextContent(type="text", text=cached_md)])
         skill_md = Path(skill["path"]) / "SKILL.md"
         if skill_md.exists():
             try:
@@ -376,7 +549,12 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
 async def main() -> None:
     async with stdio_server() as (read_stream, write_stream):
         opts = server.create_initialization_options(notification_options=NotificationOptions(tools_changed=True))
-        await server.run(read_stream, write_stream, opts)
+        watcher = asyncio.create_task(_watch_skills()) if _SKILLS_POLL_INTERVAL > 0 else None
+        try:
+            await server.run(read_stream, write_stream, opts)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
 
 
 if __name__ == "__main__":
@@ -12,11 +12,17 @@ import tempfile
 from pathlib import Path
 from typing import Iterable
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_MCP_CONFIG = Path.home() / ".config/Code/User/mcp.json"
 DEFAULT_SKILL_BRIDGE_DIR = Path.home() / ".config/Code/User/mcp/skill-bridge"
 LOCAL_SKILL_BRIDGE_SCRIPT = PROJECT_ROOT / "mcp/skill-bridge/skill_bridge.py"
+TORCH_CPU_INDEX_URL = "https://download.pytorch.org/whl/cpu"
 SYSTEM_PACKAGES = ["espeak-ng", "libportaudio2", "ffmpeg", "alsa-utils", "rubberband-cli"]
 USER_BIN_DIR = Path.home() / ".local/bin"
 SUPPORTED_MIN_PY = (3, 10)
@@ -31,9 +37,9 @@ def run(
     env: dict[str, str] | None = None,
 ) -> subprocess.CompletedProcess[str]:
     print(f"[run] {' '.join(cmd)}")
-    merged_env = dict(os.environ)
-    if env:
-        merged_env.update(env)
+    # Only copy the environment when there is something to override; env=None inherits
+    # os.environ as-is.
+    merged_env = {**os.environ, **env} if env else None
     return subprocess.run(cmd, text=True, cwd=str(cwd or PROJECT_ROOT), check=check, env=merged_env)
 
 
@@ -48,6 +54,9 @@ def ensure_env_file() -> None:
 
 
 def _python_version(python_bin: Path | str) -> tuple[int, int]:
+    # Avoid spawning an interpreter when the answer is already known.
+    if str(python_bin) == sys.executable:
+        return sys.version_info[0], sys.version_info[1]
     out = subprocess.check_output(
         [str(python_bin), "-c", "import sys; print(f'{sys.version_info.major}.{sys.version_info.minor}')"],
         text=True,
@@ -61,16 +70,7 @@ def _is_supported_python(version: tuple[int, int]) -> bool:
 
 
 def _iter_unique(values: Iterable[str | None]) -> list[str]:
-    out: list[str] = []
-    seen: set[str] = set()
-    for item in values:
-        if not item:
-            continue
-        if item in seen:
-            continue
-        seen.add(item)
-        out.append(item)
-    return out
+    return list(dict.fromkeys(v for v in values if v))
 
 
 def select_base_python(preferred_python: str | None = None) -> Path:
@@ -127,20 +127,6 @@ def create_or_get_python(venv_dir: Path, skip_venv: bool, *, base_python: Path)
     return py
 
 
-def _read_requirements_lines(req_path: Path) -> list[str]:
-    return req_path.read_text(encoding="utf-8").splitlines()
-
-
-def _is_torch_req(line: str) -> bool:
-    stripped = line.strip().lower()
-    return bool(stripped) and not stripped.startswith("#") and stripped.startswith("torch")
-
-
-def _is_accelerate_req(line: str) -> bool:
-    stripped = line.strip().lower()
-    return bool(stripped) and not stripped.startswith("#") and stripped.startswith("accelerate")
-
-
 def install_python_deps(py: Path, *, upgrade_pip: bool, torch_mode: str) -> None:
     req = PROJECT_ROOT / "requirements.txt"
     if upgrade_pip:
@@ -148,43 +134,36 @@ def install_python_deps(py: Path, *, upgrade_pip: bool, torch_mode: str) -> None
         if result.returncode != 0:
             print("[warn] Could not upgrade pip; continuing with dependency installation.")
 
-    lines = _read_requirements_lines(req)
-    accelerate_reqs = [ln.strip() for ln in lines if _is_accelerate_req(ln)]
-    base_lines = [ln for ln in lines if not _is_torch_req(ln) and not _is_accelerate_req(ln)]
-
     if torch_mode == "cpu":
-        run(
-            [
-                str(py),
-                "-m",
-                "pip",
-                "install",
-                "--index-url",
-                "https://download.pytorch.org/whl/cpu",
-                "torch",
-            ],
-            check=True,
-        )
+        # The CPU wheel index must be the only source for torch (--extra-index-url would let
+        # PyPI's CUDA wheels win), so it gets its own install; the rest then finds it satisfied.
+        run([str(py), "-m", "pip", "install", "--index-url", TORCH_CPU_INDEX_URL, "torch"], check=True)
+        torch_lines = []
     elif torch_mode == "default":
-        run([str(py), "-m", "pip", "install", "torch"], check=True)
+        torch_lines = ["torch"]
     else:
         raise RuntimeError(f"Invalid torch mode: {torch_mode}")
 
+    # torch comes from the --torch mode rather than requirements.txt. Everything else goes into
+    # one requirements file so pip resolves the whole graph (accelerate, the rest) in one pass.
+    base_lines: list[str] = []
+    with req.open(encoding="utf-8") as fh:
+        for ln in fh:
+            if not ln.strip().lower().startswith("torch"):
+                base_lines.append(ln.rstrip("\n"))
+
     with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", delete=False) as tmp:
-        tmp.write("\n".join(base_lines).strip() + "\n")
-        base_req_path = Path(tmp.name)
+        tmp.write("\n".join(torch_lines + base_lines).strip() + "\n")
+        combined_req_path = Path(tmp.name)
 
     try:
-        run([str(py), "-m", "pip", "install", "-r", str(base_req_path)], check=True)
+        run([str(py), "-m", "pip", "install", "-r", str(combined_req_path)], check=True)
     finally:
         try:
-            base_req_path.unlink(missing_ok=True)
+            combined_req_path.unlink(missing_ok=True)
         except Exception:
             pass
 
-    for accel_req in accelerate_reqs:
-        run([str(py), "-m", "pip", "install", accel_req], check=True)
-
 
 def install_project_package(py: Path) -> None:
     run(
@@ -193,12 +172,33 @@ def install_project_package(py: Path) -> None:
     )
 
 
+def _system_packages_installed(packages: list[str]) -> bool:
+    dpkg_query = shutil.which("dpkg-query")
+    if not dpkg_query:
+        return False
+    probe = subprocess.run(
+        [dpkg_query, "-W", "-f=${Package} ${Status}\n", *packages],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    installed = {
+        line.split(" ", 1)[0].split(":", 1)[0]
+        for line in probe.stdout.splitlines()
+        if line.endswith(" install ok installed")
+    }
+    return all(pkg in installed for pkg in packages)
+
+
 def install_system_deps() -> None:
     apt = shutil.which("apt-get")
     sudo = shutil.which("sudo")
     if not apt:
         print("[warn] apt-get is not available; skipping system packages.")
         return
+    if _system_packages_installed(SYSTEM_PACKAGES):
+        print("[ok] system deps already present")
+        return
     prefix: list[str] = []
     if sudo and os.geteuid() != 0:
         # In interactive terminals, allow sudo password prompt to avoid skipping critical deps.
@@ -217,13 +217,41 @@ def install_system_deps() -> None:
 def install_skill_reqs(py: Path, skills_dir: Path) -> None:
     if not skills_dir.exists():
         return
-    for skill in sorted(skills_dir.iterdir()):
-        if not skill.is_dir():
-            continue
+    reqs: list[tuple[str, Path]] = []
+    with os.scandir(skills_dir) as it:
+        skill_dirs = sorted(Path(entry.path) for entry in it if entry.is_dir())
+    for skill in skill_dirs:
         for name in ("requirements.txt", "requirements-dev.txt"):
             req = skill / name
             if req.exists():
-                run([str(py), "-m", "pip", "install", "-r", str(req)], check=True)
+                reqs.append((skill.name, req.resolve()))
+    if not reqs:
+        return
+
+    # Batch into a single pip run: one resolver pass, and never two pips on the same venv.
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", delete=False) as tmp:
+        tmp.write("".join(f"-r {req}\n" for _, req in reqs))
+        combined_req_path = Path(tmp.name)
+
+    try:
+        result = run([str(py), "-m", "pip", "install", "-r", str(combined_req_path)], check=False)
+    finally:
+        try:
+            combined_req_path.unlink(missing_ok=True)
+        except Exception:
+            pass
+    if result.returncode == 0:
+        return
+
+    # One broken or conflicting pin fails the whole batch; install skill by skill so the others
+    # still get their deps, and name the ones that failed.
+    print("[warn] Combined skill requirements install failed; retrying per skill.")
+    failed: list[str] = []
+    for skill_name, req in reqs:
+        if run([str(py), "-m", "pip", "install", "-r", str(req)], check=False).returncode != 0:
+            failed.append(f"{skill_name} ({req.name})")
+    if failed:
+        raise RuntimeError("Skill requirements failed to install: " + ", ".join(failed))
 
 
 def sync_workspace_skills(py: Path) -> None:
@@ -235,11 +263,18 @@ def sync_workspace_skills(py: Path) -> None:
 
 
 def _merge_paths(existing: str, additions: list[str]) -> str:
-    items = [p for p in existing.split(os.pathsep) if p] if existing else []
-    for p in additions:
-        if p not in items:
-            items.append(p)
-    return os.pathsep.join(items)
+    return os.pathsep.join(dict.fromkeys([*filter(None, existing.split(os.pathsep)), *additions]))
+
+
+def _write_json_atomic(path: Path, data: dict) -> None:
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        payload = (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+    # Write next to the target and rename so a crash never leaves a truncated mcp.json.
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
 
 
 def configure_mcp_json(
@@ -274,16 +309,34 @@ def configure_mcp_json(
     }
 
     data["servers"] = servers
-    mcp_config.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    _write_json_atomic(mcp_config, data)
     print(f"[ok] mcp.json updated: {mcp_config}")
 
 
+def _copy_file(src: Path, dst: Path) -> None:
+    # copy_file_range lets CoW filesystems (btrfs/XFS) reflink instead of copying bytes.
+    if hasattr(os, "copy_file_range"):
+        try:
+            with src.open("rb") as fsrc, dst.open("wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                return
+        except OSError:
+            pass
+    shutil.copyfile(src, dst)
+
+
 def install_skill_bridge_files(skill_bridge_dir: Path) -> None:
     if not LOCAL_SKILL_BRIDGE_SCRIPT.exists():
         raise RuntimeError(f"Local skill-bridge script not found: {LOCAL_SKILL_BRIDGE_SCRIPT}")
     skill_bridge_dir.mkdir(parents=True, exist_ok=True)
     target = skill_bridge_dir / "skill_bridge.py"
-    shutil.copyfile(LOCAL_SKILL_BRIDGE_SCRIPT, target)
+    _copy_file(LOCAL_SKILL_BRIDGE_SCRIPT, target)
     target.chmod(0o755)
     print(f"[ok] skill-bridge installed at {target}")
 
@@ -4,6 +4,8 @@ from __future__ import annotations
 import argparse
 import os
 import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -27,14 +29,8 @@ EXCLUDED_REL_DIRS = {
     Path("data/local"),
 }
 EXCLUDED_FILE_SUFFIXES = {".pyc", ".pyo"}
-
-
-def _path_startswith(path: Path, base: Path) -> bool:
-    try:
-        path.relative_to(base)
-        return True
-    except ValueError:
-        return False
+_EXCLUDED_REL_PREFIXES = tuple(f"{p.as_posix()}/" for p in EXCLUDED_REL_DIRS)
+COPY_WORKERS = 8
 
 
 def _is_skill_dir(path: Path) -> bool:
@@ -61,35 +57,47 @@ def _collect_sources(extra_sources: list[Path]) -> list[Path]:
     return out
 
 
-def _ignore_factory(source_root: Path, max_file_mb: int):
-    max_bytes = max_file_mb * 1024 * 1024
-
-    def _ignore(current_dir: str, names: list[str]) -> set[str]:
-        current = Path(current_dir)
-        ignored: set[str] = set()
-        rel_current = current.relative_to(source_root)
-
-        for name in names:
-            rel = rel_current / name
-            full = current / name
-            if name in EXCLUDED_DIR_NAMES:
-                ignored.add(name)
-                continue
-            if any(_path_startswith(rel, blocked) for blocked in EXCLUDED_REL_DIRS):
-                ignored.add(name)
-                continue
-            if full.is_file() and full.suffix.lower() in EXCLUDED_FILE_SUFFIXES:
-                ignored.add(name)
-                continue
-            if full.is_file():
+def _collect_tree(source_root: Path, max_bytes: int) -> tuple[list[Path], list[Path]]:
+    # Walk once with scandir; DirEntry caches type and stat, so each entry costs at most one stat.
+    dirs: list[Path] = []
+    files: list[Path] = []
+    pending = [Path()]
+    while pending:
+        rel_dir = pending.pop()
+        dirs.append(rel_dir)
+        with os.scandir(source_root / rel_dir) as it:
+            for entry in it:
+                rel = rel_dir / entry.name
+                if entry.name in EXCLUDED_DIR_NAMES:
+                    continue
+                # Excluded dirs are pruned here, so their contents are never even listed.
+                if f"{rel.as_posix()}/".startswith(_EXCLUDED_REL_PREFIXES):
+                    continue
+                if entry.is_dir():
+                    pending.append(rel)
+                    continue
                 try:
-                    if full.stat().st_size > max_bytes:
-                        ignored.add(name)
+                    st = entry.stat()
                 except OSError:
-                    pass
-        return ignored
+                    continue
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                if Path(entry.name).suffix.lower() in EXCLUDED_FILE_SUFFIXES or st.st_size > max_bytes:
+                    continue
+                files.append(rel)
+    return dirs, files
+
 
-    return _ignore
+def _copy_tree(source_root: Path, target_root: Path, max_file_mb: int) -> None:
+    dirs, files = _collect_tree(source_root, max_file_mb * 1024 * 1024)
+    for rel in dirs:
+        (target_root / rel).mkdir(parents=True, exist_ok=True)
+    # copy2 uses os.sendfile on Linux; copies are independent so they overlap well in threads.
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+        for _ in pool.map(lambda rel: shutil.copy2(source_root / rel, target_root / rel), files):
+            pass
+    for rel in reversed(dirs):
+        shutil.copystat(source_root / rel, target_root / rel)
 
 
 def sync_skills(
@@ -125,8 +133,7 @@ def sync_skills(
                     skipped += 1
                     continue
                 shutil.rmtree(target)
-            ignore = _ignore_factory(skill_dir.resolve(), max_file_mb=max_file_mb)
-            shutil.copytree(skill_dir, target, ignore=ignore)
+            _copy_tree(skill_dir, target, max_file_mb=max_file_mb)
             copied += 1
     return copied, skipped
 
@@ -2,8 +2,13 @@
 from __future__ import annotations
 
 import argparse
+import io
+import mmap
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
+from typing import Any
 
 from pypdf import PdfReader, PdfWriter, Transformation
 from pypdf import PageObject
@@ -14,12 +19,48 @@ def _page_size(page: PageObject) -> tuple[float, float]:
     return float(box.width), float(box.height)
 
 
+def _map_pdf(path: Path) -> mmap.mmap | io.BytesIO:
+    # Kept identical to merge_pdfs._map_pdf (the scripts are standalone); rationale there.
+    with path.open("rb") as fh:
+        try:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return io.BytesIO(fh.read())
+    if hasattr(mmap, "MADV_WILLNEED"):
+        mapped.madvise(mmap.MADV_WILLNEED)
+    return mapped
+
+
+_DEDUPE_MAX_PASSES = 4
+
+
+def _write_pdf(writer: PdfWriter, output_pdf: Path, *, dedupe: bool) -> None:
+    # Shared objects of one reader are already cloned once per writer; this additionally folds
+    # byte-identical objects the source itself duplicated (pypdf >= 4.3). One pass only merges
+    # objects whose references already match, so repeat (an ICC profile, then the color space
+    # using it, then the image...) until the written output stops shrinking.
+    output_pdf.parent.mkdir(parents=True, exist_ok=True)
+    if dedupe and hasattr(writer, "compress_identical_objects"):
+        size = None
+        for _ in range(_DEDUPE_MAX_PASSES):
+            writer.compress_identical_objects()
+            buf = io.BytesIO()
+            writer.write(buf)
+            if size is not None and buf.tell() >= size:
+                break
+            size = buf.tell()
+        output_pdf.write_bytes(buf.getbuffer())
+        return
+    with output_pdf.open("wb") as f:
+        writer.write(f)
+
+
 def _copy_metadata(writer: PdfWriter, reader: PdfReader) -> None:
     meta = getattr(reader, "metadata", None)
     if not meta:
         return
     try:
-        writer.add_metadata({k: ("" if v is None else str(v)) for k, v in dict(meta).items()})
+        writer.add_metadata({k: ("" if v is None else str(v)) for k, v in meta.items()})
     except Exception:
         pass
 
@@ -33,6 +74,123 @@ def _copy_boxes(dst: PageObject, src: PageObject) -> None:
             pass
 
 
+_WHITE_ALPHA_KERNEL: Any = None
+
+
+def _white_alpha_kernel() -> Any:
+    # Numba is optional; the compiled kernel (or False when unavailable) is cached per process.
+    global _WHITE_ALPHA_KERNEL
+    if _WHITE_ALPHA_KERNEL is not None:
+        return _WHITE_ALPHA_KERNEL or None
+    try:
+        from numba import njit, prange
+    except Exception:
+        _WHITE_ALPHA_KERNEL = False
+        return None
+
+    # No fastmath: the soft ramp must truncate exactly like the NumPy path.
+    @njit(parallel=True, cache=True)
+    def _white_alpha(rgb, t0, s, out):
+        for i in prange(rgb.shape[0]):
+            mn = min(rgb[i, 0], min(rgb[i, 1], rgb[i, 2]))
+            if s == 0:
+                out[i] = 0 if mn >= t0 else 255
+            elif mn <= t0:
+                out[i] = 255
+            elif mn >= t0 + s:
+                out[i] = 0
+            else:
+                out[i] = int(255.0 * (1.0 - (mn - t0) / s))
+
+    _WHITE_ALPHA_KERNEL = _white_alpha
+    return _white_alpha
+
+
+# Rendered overlay: PNG bytes plus its placement as fractions (x0, y0, x1, y1) of the page rect,
+# or None when the page keys out completely.
+OverlayImage = tuple[bytes, tuple[float, float, float, float]] | None
+
+
+def _to_rgba_with_alpha(pix: Any, white_threshold: int, softness: int, png_level: int = 1) -> OverlayImage:
+    import io
+
+    import numpy as np
+    from PIL import Image
+
+    rgb = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+    # Whiteness heuristic: if all 3 channels >= threshold => transparent.
+    t0 = white_threshold
+    s = softness
+    kernel = _white_alpha_kernel()
+    if kernel is not None:
+        # One fused, multi-threaded pass instead of NumPy's min/where temporaries.
+        alpha = np.empty(pix.height * pix.width, dtype=np.uint8)
+        kernel(rgb.reshape(-1, 3), t0, s, alpha)
+        alpha = alpha.reshape(pix.height, pix.width)
+    elif s == 0:
+        mn = rgb.min(axis=2)
+        alpha = np.where(mn >= t0, 0, 255).astype(np.uint8)
+    else:
+        mn = rgb.min(axis=2)
+        ramp = 255.0 * (1.0 - (mn.astype(np.float64) - t0) / s)
+        alpha = np.where(mn <= t0, 255, np.where(mn >= t0 + s, 0, ramp)).astype(np.uint8)
+
+    # Only the bounding box of non-transparent pixels is encoded and embedded; the keyed-out
+    # margin would be invisible anyway.
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(alpha.any(axis=0))
+    y0, y1 = int(rows[0]), int(rows[-1]) + 1
+    x0, x1 = int(cols[0]), int(cols[-1]) + 1
+    rgba = Image.fromarray(np.dstack((rgb[y0:y1, x0:x1], alpha[y0:y1, x0:x1])), "RGBA")
+
+    # The PNG is only embedded in the output PDF, so favor encode speed over size by default.
+    buf = io.BytesIO()
+    rgba.save(buf, format="PNG", compress_level=png_level)
+    return buf.getvalue(), (x0 / pix.width, y0 / pix.height, x1 / pix.width, y1 / pix.height)
+
+
+def _render_overlay_png(
+    doc: Any,
+    page_index: int,
+    dpi: int,
+    white_threshold: int,
+    softness: int,
+    png_level: int,
+) -> OverlayImage:
+    import fitz
+
+    scale = dpi / 72.0
+    pix = doc.load_page(page_index).get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+    return _to_rgba_with_alpha(pix, white_threshold, softness, png_level)
+
+
+# Per-process source document for overlay render workers (opened once by the initializer).
+_WORKER_DOC: Any = None
+
+
+def _init_render_worker(input_pdf: str) -> None:
+    global _WORKER_DOC, _WHITE_ALPHA_KERNEL
+    import fitz
+
+    _WORKER_DOC = fitz.open(input_pdf)
+    # The workers already split the pages across cores; a per-worker numba thread pool would
+    # oversubscribe the CPU (and each worker would pay the numba import/JIT), so keying runs
+    # on the NumPy path here. The parallel kernel is only used when --jobs is 1.
+    _WHITE_ALPHA_KERNEL = False
+
+
+def _render_overlay_png_worker(
+    page_index: int,
+    dpi: int,
+    white_threshold: int,
+    softness: int,
+    png_level: int,
+) -> OverlayImage:
+    return _render_overlay_png(_WORKER_DOC, page_index, dpi, white_threshold, softness, png_level)
+
+
 def two_up(
     input_pdf: Path,
     output_pdf: Path,
@@ -46,13 +204,16 @@ def two_up(
     password: str | None,
     keep_metadata: bool,
     drop_last: bool,
+    jobs: int = 1,
+    png_level: int = 1,
+    dedupe: bool = False,
 ) -> int:
     if not input_pdf.exists():
         raise FileNotFoundError(f"Does not exist: {input_pdf}")
     if output_pdf.exists() and not overwrite:
         raise FileExistsError(f"Already exists: {output_pdf} (use --overwrite)")
 
-    reader = PdfReader(str(input_pdf))
+    reader = PdfReader(_map_pdf(input_pdf))
     if reader.is_encrypted:
         if not password:
             raise RuntimeError("Encrypted PDF (missing --password)")
@@ -60,10 +221,12 @@ def two_up(
         if not ok:
             raise RuntimeError("Invalid password")
 
-    # Normalize rotation so content has /Rotate=0.
+    # Normalize rotation so content has /Rotate=0. Upright pages are skipped: the transfer
+    # would only rewrite their content stream with an identity transform.
     for p in reader.pages:
         try:
-            p.transfer_rotation_to_content()
+            if p.rotation % 360:
+                p.transfer_rotation_to_content()
         except Exception:
             pass
 
@@ -96,16 +259,12 @@ def two_up(
             writer.add_page(out)
             i += 2
 
-        output_pdf.parent.mkdir(parents=True, exist_ok=True)
-        with output_pdf.open("wb") as f:
-            writer.write(f)
+        _write_pdf(writer, output_pdf, dedupe=dedupe)
         return 0
 
     if mode == "overlay_transparent":
         # Render page 2 as image and turn white into transparency so page 1
         # remains visible underneath without changing page size.
-        import io
-
         try:
             import fitz  # PyMuPDF
         except Exception as exc:  # pragma: no cover
@@ -116,82 +275,84 @@ def two_up(
         except Exception as exc:  # pragma: no cover
             raise RuntimeError(f"Missing Pillow (PIL): {exc}")
 
+        try:
+            import numpy as np
+        except Exception as exc:  # pragma: no cover
+            raise RuntimeError(f"Missing NumPy: {exc}")
+
         if dpi <= 0:
             raise ValueError("--dpi must be > 0")
         if not (0 <= white_threshold <= 255):
             raise ValueError("--white-threshold must be between 0 and 255")
         if softness < 0:
             raise ValueError("--softness must be >= 0")
+        if not (0 <= png_level <= 9):
+            raise ValueError("--png-level must be between 0 and 9")
 
         src = fitz.open(str(input_pdf))
         out = fitz.open()
 
-        def to_rgba_with_alpha(pix: "fitz.Pixmap") -> bytes:
-            im = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
-            # Whiteness heuristic: if all 3 channels >= threshold => transparent.
-            # (no numpy; single pass over bytes)
-            rgb = im.tobytes()
-            alpha = bytearray(len(rgb) // 3)
-            t0 = white_threshold
-            s = softness
-            j = 0
-            for k in range(0, len(rgb), 3):
-                rr = rgb[k]
-                gg = rgb[k + 1]
-                bb = rgb[k + 2]
-                if s == 0:
-                    a = 0 if (rr >= t0 and gg >= t0 and bb >= t0) else 255
-                else:
-                    mn = rr if rr < gg else gg
-                    mn = mn if mn < bb else bb
-                    if mn <= t0:
-                        a = 255
-                    elif mn >= t0 + s:
-                        a = 0
-                    else:
-                        a = int(255 * (1.0 - (mn - t0) / s))
-                alpha[j] = a
-                j += 1
-
-            rgba = im.convert("RGBA")
-            rgba.putalpha(Image.frombytes("L", im.size, bytes(alpha)))
-
-            buf = io.BytesIO()
-            rgba.save(buf, format="PNG", optimize=True)
-            return buf.getvalue()
-
-        scale = dpi / 72.0
-        matrix = fitz.Matrix(scale, scale)
-
-        i = 0
         n = src.page_count
-        while i < n:
-            base = src.load_page(i)
-            ov = src.load_page(i + 1) if i + 1 < n else None
-            if ov is None and drop_last:
-                break
-
-            newp = out.new_page(width=base.rect.width, height=base.rect.height)
-            newp.show_pdf_page(newp.rect, src, i)
-
-            if ov is not None:
-                pix = ov.get_pixmap(matrix=matrix, alpha=False)
-                png = to_rgba_with_alpha(pix)
-                newp.insert_image(newp.rect, stream=png, keep_proportion=False, overlay=True)
+        overlay_indices = [i + 1 for i in range(0, n, 2) if i + 1 < n]
+        pool: ProcessPoolExecutor | None = None
+        if jobs > 1 and len(overlay_indices) > 1:
+            # Rendering + keying + encoding is independent per page; map() keeps page order.
+            pool = ProcessPoolExecutor(
+                max_workers=min(jobs, len(overlay_indices)),
+                initializer=_init_render_worker,
+                initargs=(str(input_pdf),),
+            )
+            pngs = pool.map(
+                _render_overlay_png_worker,
+                overlay_indices,
+                repeat(dpi),
+                repeat(white_threshold),
+                repeat(softness),
+                repeat(png_level),
+            )
+        else:
+            pngs = (
+                _render_overlay_png(src, k, dpi, white_threshold, softness, png_level) for k in overlay_indices
+            )
 
-            i += 2
+        try:
+            i = 0
+            while i < n:
+                base = src.load_page(i)
+                has_overlay = i + 1 < n
+                if not has_overlay and drop_last:
+                    break
+
+                newp = out.new_page(width=base.rect.width, height=base.rect.height)
+                newp.show_pdf_page(newp.rect, src, i)
+
+                overlay = next(pngs) if has_overlay else None
+                if overlay is not None:
+                    png, (fx0, fy0, fx1, fy1) = overlay
+                    r = newp.rect
+                    clip = fitz.Rect(
+                        r.x0 + fx0 * r.width,
+                        r.y0 + fy0 * r.height,
+                        r.x0 + fx1 * r.width,
+                        r.y0 + fy1 * r.height,
+                    )
+                    newp.insert_image(clip, stream=png, keep_proportion=False, overlay=True)
+
+                i += 2
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
 
         out.save(str(output_pdf))
         out.close()
         src.close()
         return 0
 
-    max_w = 0.0
-    max_h = 0.0
-    for p in reader.pages:
-        w, h = _page_size(p)
-        max_w = max(max_w, w)
-        max_h = max(max_h, h)
+    pages = list(reader.pages)
+    # One mediabox lookup per page; the pair loop below reuses these sizes.
+    sizes = [_page_size(p) for p in pages]
+    max_w = max(0.0, *(w for w, _ in sizes))
+    max_h = max(0.0, *(h for _, h in sizes))
 
     if layout not in {"h", "v"}:
         raise ValueError("Invalid layout (use 'h' or 'v')")
@@ -203,40 +364,43 @@ def two_up(
     slot_w = max_w / 2.0 if layout == "h" else max_w
     slot_h = max_h if layout == "h" else max_h / 2.0
 
-    def place(src: PageObject, dest: PageObject, *, slot_x: float, slot_y: float) -> None:
-        sw, sh = _page_size(src)
+    # Documents usually repeat a handful of page sizes, so each slot transform is built once.
+    transforms: dict[tuple[float, float, float, float], Transformation] = {}
+
+    def place(i: int, dest: PageObject, *, slot_x: float, slot_y: float) -> None:
+        sw, sh = sizes[i]
         if sw <= 0 or sh <= 0:
             return
-        scale = min(slot_w / sw, slot_h / sh)
-        tx = slot_x + (slot_w - sw * scale) / 2.0
-        ty = slot_y + (slot_h - sh * scale) / 2.0
-        dest.merge_transformed_page(src, Transformation().scale(scale).translate(tx, ty), over=True)
+        key = (sw, sh, slot_x, slot_y)
+        ctm = transforms.get(key)
+        if ctm is None:
+            scale = min(slot_w / sw, slot_h / sh)
+            tx = slot_x + (slot_w - sw * scale) / 2.0
+            ty = slot_y + (slot_h - sh * scale) / 2.0
+            ctm = transforms[key] = Transformation().scale(scale).translate(tx, ty)
+        dest.merge_transformed_page(pages[i], ctm, over=True)
 
-    pages = list(reader.pages)
     i = 0
     while i < len(pages):
-        p1 = pages[i]
-        p2 = pages[i + 1] if i + 1 < len(pages) else None
-        if p2 is None and drop_last:
+        has_p2 = i + 1 < len(pages)
+        if not has_p2 and drop_last:
             break
 
         out = PageObject.create_blank_page(width=max_w, height=max_h)
         if layout == "h":
-            place(p1, out, slot_x=0.0, slot_y=0.0)
-            if p2 is not None:
-                place(p2, out, slot_x=slot_w, slot_y=0.0)
+            place(i, out, slot_x=0.0, slot_y=0.0)
+            if has_p2:
+                place(i + 1, out, slot_x=slot_w, slot_y=0.0)
         else:
             # Vertical: first page on top, second below
-            place(p1, out, slot_x=0.0, slot_y=slot_h)
-            if p2 is not None:
-                place(p2, out, slot_x=0.0, slot_y=0.0)
+            place(i, out, slot_x=0.0, slot_y=slot_h)
+            if has_p2:
+                place(i + 1, out, slot_x=0.0, slot_y=0.0)
 
         writer.add_page(out)
         i += 2
 
-    output_pdf.parent.mkdir(parents=True, exist_ok=True)
-    with output_pdf.open("wb") as f:
-        writer.write(f)
+    _write_pdf(writer, output_pdf, dedupe=dedupe)
     return 0
 
 
@@ -286,6 +450,23 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
         default=10,
         help="Only for mode=overlay_transparent: smooth alpha range (0=hard keying)",
     )
+    p.add_argument(
+        "--png-level",
+        type=int,
+        default=1,
+        help="Only for mode=overlay_transparent: PNG compression level 0-9 (higher = smaller, slower)",
+    )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Only for mode=overlay_transparent: render overlay pages in N worker processes",
+    )
+    p.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Only for mode=overlay/2up: merge byte-identical objects (fonts, images) before writing",
+    )
     p.add_argument("--overwrite", action="store_true", help="Overwrite output if it exists")
     p.add_argument("--password", help="Password if the PDF is encrypted")
     p.add_argument("--no-metadata", action="store_true", help="Do not copy original PDF metadata")
@@ -312,6 +493,9 @@ def main(argv: list[str]) -> int:
             password=args.password,
             keep_metadata=not bool(args.no_metadata),
             drop_last=bool(args.drop_last),
+            jobs=int(args.jobs),
+            png_level=int(args.png_level),
+            dedupe=bool(args.dedupe),
         )
     except Exception as exc:
         print(f"[error] {exc}", file=sys.stderr)
@@ -9,6 +9,7 @@ Structure:
 
 from __future__ import annotations
 
+import os
 import shutil
 from pathlib import Path
 
@@ -20,7 +21,11 @@ LOCAL_DATA_DIR = DATA_DIR / "local"
 ELEMENTS_FILE = LOCAL_DATA_DIR / "elements.json"
 CAPTURES_DIR = LOCAL_DATA_DIR / "captures"
 SEQUENCES_DIR = LOCAL_DATA_DIR / "sequences"
+# seq-list summaries keyed by sequence name; kept outside SEQUENCES_DIR so it is never listed.
+SEQUENCES_INDEX_FILE = LOCAL_DATA_DIR / "sequences_index.json"
 SOUNDS_STATE_FILE = LOCAL_DATA_DIR / "sounds_state.json"
+# Written once seeding succeeded; later runs skip the copy/glob/stat work.
+SEEDED_SENTINEL = LOCAL_DATA_DIR / ".seeded"
 
 EXAMPLE_ELEMENTS_FILE = EXAMPLES_DIR / "elements.json"
 EXAMPLE_SEQUENCES_DIR = EXAMPLES_DIR / "sequences"
@@ -33,17 +38,33 @@ def _copy_if_missing(src: Path, dst: Path) -> None:
         shutil.copy2(src, dst)
 
 
+def _has_json(directory: Path) -> bool:
+    with os.scandir(directory) as it:
+        return any(entry.name.endswith(".json") for entry in it)
+
+
+_ensured = False
+
+
 def ensure_local_data() -> None:
     """Initializes data/local with example files when missing."""
+    global _ensured
+    if _ensured:
+        return
+    # Always recreated: the sentinel only vouches for the seeded files, and commands write
+    # into these directories without checking for them.
     CAPTURES_DIR.mkdir(parents=True, exist_ok=True)
     SEQUENCES_DIR.mkdir(parents=True, exist_ok=True)
+    if SEEDED_SENTINEL.exists():
+        _ensured = True
+        return
 
     if EXAMPLE_ELEMENTS_FILE.exists():
         _copy_if_missing(EXAMPLE_ELEMENTS_FILE, ELEMENTS_FILE)
     elif not ELEMENTS_FILE.exists():
         ELEMENTS_FILE.write_text("{}", encoding="utf-8")
 
-    if EXAMPLE_SEQUENCES_DIR.exists() and not any(SEQUENCES_DIR.glob("*.json")):
+    if EXAMPLE_SEQUENCES_DIR.exists() and not _has_json(SEQUENCES_DIR):
         for src in EXAMPLE_SEQUENCES_DIR.glob("*.json"):
             _copy_if_missing(src, SEQUENCES_DIR / src.name)
 
@@ -51,3 +72,6 @@ def ensure_local_data() -> None:
         _copy_if_missing(EXAMPLE_SOUNDS_STATE_FILE, SOUNDS_STATE_FILE)
     elif not SOUNDS_STATE_FILE.exists():
         SOUNDS_STATE_FILE.write_text('{"enabled": false, "volume": 0.5}\n', encoding="utf-8")
+
+    SEEDED_SENTINEL.touch()
+    _ensured = True
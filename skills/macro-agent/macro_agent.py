@@ -14,9 +14,12 @@ import os
 import json
 import time
 import argparse
-import glob
+import fnmatch
+import re
 import unicodedata
 import base64
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import List, Dict, Optional, Any, Tuple
 from data_paths import (
@@ -25,15 +28,22 @@ from data_paths import (
     ELEMENTS_FILE as ELEMENTS_FILE_PATH,
     CAPTURES_DIR as CAPTURES_DIR_PATH,
     SEQUENCES_DIR as SEQUENCES_DIR_PATH,
+    SEQUENCES_INDEX_FILE as SEQUENCES_INDEX_FILE_PATH,
     ensure_local_data,
 )
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Local runtime paths (unversioned), seeded from examples.
 SKILL_DIR = str(SKILL_DIR_PATH)
 DATA_DIR = str(LOCAL_DATA_DIR)
 ELEMENTS_FILE = str(ELEMENTS_FILE_PATH)
 CAPTURES_DIR = str(CAPTURES_DIR_PATH)
 SEQUENCES_DIR = str(SEQUENCES_DIR_PATH)
+SEQUENCES_INDEX_FILE = str(SEQUENCES_INDEX_FILE_PATH)
 ensure_local_data()
 
 # Sound manager (optional audio feedback)
@@ -61,22 +71,76 @@ except ImportError:
     def set_volume(v): return "Sounds not available"
     def get_sound_status(): return {"enabled": False, "available": False}
 
-try:
-    import pyautogui
-    import cv2
-    import numpy as np
-    pyautogui.FAILSAFE = True
-    pyautogui.PAUSE = 0.05
-    HAS_PYAUTOGUI = True
-    HAS_CV2 = True
-except ImportError:
-    HAS_PYAUTOGUI = False
-    HAS_CV2 = False
+# GUI/vision libraries (lazy loaded: importing them costs ~1 s, which commands that
+# never touch the mouse or the screen should not pay)
+pyautogui = None
+cv2 = None
+np = None
+_pyautogui_loaded = False
+_cv2_loaded = False
+HAS_PYAUTOGUI = False
+HAS_CV2 = False
+
+
+def _load_pyautogui() -> bool:
+    """Lazy load pyautogui"""
+    global pyautogui, _pyautogui_loaded, HAS_PYAUTOGUI
+    if _pyautogui_loaded:
+        return HAS_PYAUTOGUI
+
+    _pyautogui_loaded = True
+    try:
+        import pyautogui as _pyautogui
+        _pyautogui.FAILSAFE = True
+        _pyautogui.PAUSE = 0.05
+        pyautogui = _pyautogui
+        HAS_PYAUTOGUI = True
+    except ImportError:
+        HAS_PYAUTOGUI = False
+    return HAS_PYAUTOGUI
+
+
+def _load_cv2() -> bool:
+    """Lazy load OpenCV + NumPy"""
+    global cv2, np, _cv2_loaded, HAS_CV2
+    if _cv2_loaded:
+        return HAS_CV2
+
+    _cv2_loaded = True
+    try:
+        import cv2 as _cv2
+        import numpy as _np
+        cv2 = _cv2
+        np = _np
+        HAS_CV2 = True
+    except ImportError:
+        HAS_CV2 = False
+    return HAS_CV2
+
+
+# None: indented on a terminal, compact when piped (agents); --pretty/--compact override
+_compact_output: Optional[bool] = None
 
 
 def output(data: Dict):
     """Prints result as JSON."""
-    print(json.dumps(data, ensure_ascii=False, indent=2))
+    compact = _compact_output if _compact_output is not None else not sys.stdout.isatty()
+    buffer = getattr(sys.stdout, 'buffer', None)
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        payload = orjson.dumps(data, option=option if compact else option | orjson.OPT_INDENT_2)
+    elif compact:
+        payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n'
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2) + '\n'
+    if buffer is None:
+        # Replaced stdout (text only)
+        sys.stdout.write(payload.decode('utf-8') if isinstance(payload, bytes) else payload)
+        return
+    sys.stdout.flush()
+    # No flush per call: output is the last thing a command does and the interpreter
+    # flushes the buffer on exit, so one write syscall covers the whole result
+    buffer.write(payload if isinstance(payload, bytes) else payload.encode('utf-8'))
 
 
 def error(message: str):
@@ -89,42 +153,125 @@ def error(message: str):
 # ELEMENT FUNCTIONS (JSON)
 # ============================================
 
+# Parsed elements.json, reused while the file's (mtime_ns, size) is unchanged.
+# The dict is shared: callers that mutate it must call save_elements().
+_elements_cache: Optional[Dict[str, Dict]] = None
+_elements_stamp: Optional[Tuple[int, int]] = None
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_json(path: str) -> Any:
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data: Any):
+    """Writes indented JSON next to path and renames it into place, so a crash never
+    leaves a truncated file. Skipped when the file already holds exactly these bytes."""
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    try:
+        # Reading back (usually from the page cache) is far cheaper than write + fsync +
+        # rename, e.g. for elem-add-image of an image the element already has
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == len(payload) and f.read() == payload:
+                return
+    except FileNotFoundError:
+        pass
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
 def load_elements() -> Dict[str, Dict]:
-    """Loads elements from JSON."""
-    if not os.path.exists(ELEMENTS_FILE):
+    """Loads elements from JSON (cached until the file changes on disk)."""
+    global _elements_cache, _elements_stamp
+    stamp = _file_stamp(ELEMENTS_FILE)
+    if stamp is None:
         return {}
-    
-    with open(ELEMENTS_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    if _elements_cache is not None and stamp == _elements_stamp:
+        return _elements_cache
+    
+    _elements_cache = _read_json(ELEMENTS_FILE)
+    _elements_stamp = stamp
+    return _elements_cache
+
+
+# Per-element lowercased fields: (key, name, description, tags joined with NUL, tags joined
+# with spaces). NUL keeps get_element() tag hits inside one tag; search_elements() matches
+# the spaced form.
+_Lowered = Tuple[str, str, str, str, str]
+
+# Lowered fields for the current elements dict, built lazily: (elements, key -> lowered
+# fields). Lowercasing happens once per load/save, not on every lookup. Lookups stay linear
+# scans: each command runs in its own process, so an n-gram index would cost more to build
+# than the few lookups it serves.
+_elements_lowered: Optional[Tuple[Dict[str, Dict], Dict[str, _Lowered]]] = None
+
+
+def _lowered_fields(key: str, elem: Dict) -> _Lowered:
+    tags = elem.get('tags', [])
+    return (
+        key.lower(),
+        elem.get('name', '').lower(),
+        elem.get('description', '').lower(),
+        '\0'.join(tags).lower(),
+        ' '.join(tags).lower(),
+    )
 
 
-def save_elements(elements: Dict[str, Dict]):
-    """Saves elements to JSON."""
-    with open(ELEMENTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(elements, f, indent=2, ensure_ascii=False)
+def _lowered_elements(elements: Dict[str, Dict]) -> Dict[str, _Lowered]:
+    global _elements_lowered
+    if _elements_lowered is None or _elements_lowered[0] is not elements:
+        _elements_lowered = (elements, {key: _lowered_fields(key, elem) for key, elem in elements.items()})
+    return _elements_lowered[1]
 
 
-def get_element(name: str) -> Optional[Dict]:
-    """Gets an element by exact or partial name."""
-    elements = load_elements()
+def save_elements(elements: Dict[str, Dict]):
+    """Saves elements to JSON."""
+    global _elements_cache, _elements_stamp, _elements_lowered
+    _write_json(ELEMENTS_FILE, elements)
+    # What was just written is what a re-read would parse.
+    _elements_cache = elements
+    _elements_stamp = _file_stamp(ELEMENTS_FILE)
+    _elements_lowered = None
+
+
+def get_element(name: str, elements: Optional[Dict[str, Dict]] = None) -> Optional[Dict]:
+    """Gets an element by exact or partial name (from elements, if given, else the file)."""
+    if elements is None:
+        elements = load_elements()
     name_lower = name.lower()
     
     # First try exact match
     if name_lower in elements:
         return elements[name_lower]
     
-    # Then try partial name
-    for key, elem in elements.items():
-        if name_lower in key.lower():
-            return elem
+    # Then partial name, else tags, in one pass: a name hit wins outright,
+    # the first tag hit is kept in case no name matches.
+    tag_hit = None
+    for key, (key_lower, _, _, tags_lower, _) in _lowered_elements(elements).items():
+        if name_lower in key_lower:
+            return elements[key]
+        if tag_hit is None and name_lower in tags_lower:
+            tag_hit = elements[key]
     
-    # Then try tags
-    for key, elem in elements.items():
-        tags = elem.get('tags', [])
-        if any(name_lower in tag.lower() for tag in tags):
-            return elem
-    
-    return None
+    return tag_hit
 
 
 def add_element(name: str, description: str = "", images: List[str] = None, 
@@ -171,7 +318,216 @@ def find_element(name: str) -> Optional[Dict]:
     return get_element(name)
 
 
-def find_element_on_screen(name: str, confidence: float = 0.8) -> Tuple[Optional[Tuple[int, int]], str, Dict]:
+# Persistent mss instance for screen captures (False once mss turned out to be unavailable).
+_mss_instance = None
+
+
+def _grab_screen():
+    """Captures the whole screen as (BGR image, (left, top) of the captured area)."""
+    global _mss_instance
+    if _mss_instance is None:
+        try:
+            import mss
+            _mss_instance = mss.mss()
+        except Exception:
+            _mss_instance = False
+    if _mss_instance:
+        # All monitors as one BGRA frame, straight from XShm/GDI/CoreGraphics.
+        monitor = _mss_instance.monitors[0]
+        raw = _mss_instance.grab(monitor)
+        return cv2.cvtColor(np.asarray(raw), cv2.COLOR_BGRA2BGR), (monitor['left'], monitor['top'])
+    
+    screenshot = pyautogui.screenshot()
+    # Convert RGB to BGR (OpenCV format)
+    return cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR), (0, 0)
+
+
+# Coarse-to-fine matching: candidates come from a grayscale pass at a looser threshold
+# (half resolution, or full resolution for templates too small to survive pyrDown), then only
+# their neighbourhoods are matched in full-resolution color, so reported scores are still
+# full-resolution color scores (TM_CCOEFF_NORMED only depends on the compared patch). Flat
+# templates, or screens where the grayscale pass hits almost everywhere, use a single color pass.
+PYRAMID_MIN_SIDE = 16
+PYRAMID_SLACK = 0.2
+PYRAMID_PAD = 4
+PYRAMID_MAX_HIT_RATIO = 0.01
+
+
+# PNG names in CAPTURES_DIR as (dir mtime_ns, names in directory order, lowercased names);
+# the fallback template search filters this instead of globbing the directory once per pattern.
+_captures_listing: Optional[Tuple[int, List[str], List[str]]] = None
+
+
+def _list_captures() -> Tuple[List[str], List[str]]:
+    """Returns (names, lowercased names) of the PNGs in CAPTURES_DIR."""
+    global _captures_listing
+    try:
+        mtime = os.stat(CAPTURES_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return [], []
+    if _captures_listing is None or _captures_listing[0] != mtime:
+        with os.scandir(CAPTURES_DIR) as it:
+            names = [e.name for e in it if e.name.endswith('.png')]
+        _captures_listing = (mtime, names, [n.lower() for n in names])
+    return _captures_listing[1], _captures_listing[2]
+
+
+# Decoded templates: path -> ((mtime_ns, size), bgr, grayscale probe or None), LRU-bounded.
+TEMPLATE_CACHE_SIZE = 256
+_template_cache: "OrderedDict[str, Tuple[Tuple[int, int], Any, Any]]" = OrderedDict()
+_template_cache_lock = threading.Lock()
+
+
+def _load_template(img_path: str):
+    """Returns (bgr, probe) for a template image, or None if it can't be read.
+    
+    probe is (gray, scale, shift) for the grayscale prefilter, or None for flat templates.
+    """
+    stamp = _file_stamp(img_path)
+    if stamp is None:
+        return None
+    with _template_cache_lock:
+        cached = _template_cache.get(img_path)
+        if cached is not None and cached[0] == stamp:
+            _template_cache.move_to_end(img_path)
+            return cached[1], cached[2]
+    
+    # Load template in color for better accuracy
+    template = cv2.imread(img_path, cv2.IMREAD_COLOR)
+    if template is None:
+        return None
+    gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+    if min(template.shape[:2]) >= PYRAMID_MIN_SIDE:
+        # pyrDown reflects at the template border but sees real neighbours on screen, so the
+        # outer half-res ring is dropped; hits are shifted back by that one pixel.
+        probe = (cv2.pyrDown(gray)[1:-1, 1:-1], 2, 1)
+    else:
+        probe = (gray, 1, 0)
+    if probe[0].min() == probe[0].max():
+        # No grayscale contrast (e.g. it differs from its background only in hue).
+        probe = None
+    
+    with _template_cache_lock:
+        _template_cache[img_path] = (stamp, template, probe)
+        if len(_template_cache) > TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    return template, probe
+
+
+# Per-thread matchTemplate outputs for whole-screen passes, keyed by searched image shape.
+_result_buffers = threading.local()
+
+
+def _result_buffer(image, template):
+    """A reusable float32 result view for matching template over all of image."""
+    rows = image.shape[0] - template.shape[0] + 1
+    cols = image.shape[1] - template.shape[1] + 1
+    if rows < 1 or cols < 1:
+        return None
+    buffers = getattr(_result_buffers, 'by_shape', None)
+    if buffers is None:
+        buffers = _result_buffers.by_shape = {}
+    shape = image.shape[:2]
+    buf = buffers.get(shape)
+    if buf is None:
+        if len(buffers) >= 4:
+            # Screen geometry changed; drop buffers for old sizes.
+            buffers.clear()
+        buf = buffers[shape] = np.empty(shape, np.float32)
+    return buf[:rows, :cols]
+
+
+def _match_template(screen_bgr, screen_gray, screen_gray_half, template, probe, confidence: float):
+    """Returns (xs, ys, scores) of top-left positions scoring >= confidence, row-major."""
+    h, w = template.shape[:2]
+    if probe is not None:
+        tmpl_probe, scale, shift = probe
+        searched = screen_gray_half if scale == 2 else screen_gray
+        coarse = cv2.matchTemplate(searched, tmpl_probe, cv2.TM_CCOEFF_NORMED,
+                                   result=_result_buffer(searched, tmpl_probe))
+        hits = (coarse >= confidence - PYRAMID_SLACK).astype(np.uint8)
+        n_hits = cv2.countNonZero(hits)
+        if n_hits == 0:
+            return np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0, np.float32)
+        if n_hits <= PYRAMID_MAX_HIT_RATIO * hits.size:
+            max_x = screen_bgr.shape[1] - w
+            max_y = screen_bgr.shape[0] - h
+            found_x, found_y, found_scores = [], [], []
+            n, _, stats, _ = cv2.connectedComponentsWithStats(hits, connectivity=8)
+            for x0, y0, cw, ch, _ in stats[1:n].tolist():
+                x0 -= shift
+                y0 -= shift
+                fx0 = max(0, scale * x0 - PYRAMID_PAD)
+                fy0 = max(0, scale * y0 - PYRAMID_PAD)
+                fx1 = min(max_x, scale * (x0 + cw - 1) + PYRAMID_PAD)
+                fy1 = min(max_y, scale * (y0 + ch - 1) + PYRAMID_PAD)
+                if fx1 < fx0 or fy1 < fy0:
+                    continue
+                window = screen_bgr[fy0:fy1 + h, fx0:fx1 + w]
+                result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+                ys, xs = np.nonzero(result >= confidence)
+                found_x.append(xs + fx0)
+                found_y.append(ys + fy0)
+                found_scores.append(result[ys, xs])
+            if not found_scores:
+                return np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0, np.float32)
+            xs = np.concatenate(found_x)
+            ys = np.concatenate(found_y)
+            scores = np.concatenate(found_scores)
+            # Windows can overlap: keep one hit per position (the last window's, scanning the
+            # reversed arrays), in row-major order.
+            _, first = np.unique((ys * screen_bgr.shape[1] + xs)[::-1], return_index=True)
+            keep = len(xs) - 1 - first
+            return xs[keep], ys[keep], scores[keep]
+    
+    result = cv2.matchTemplate(screen_bgr, template, cv2.TM_CCOEFF_NORMED,
+                               result=_result_buffer(screen_bgr, template))
+    ys, xs = np.nonzero(result >= confidence)
+    # Fancy indexing copies the scores out of the reused buffer.
+    return xs, ys, result[ys, xs]
+
+
+# Elements with several images match them concurrently (matchTemplate releases the GIL).
+# concurrent.futures (and the logging it pulls in) is only imported once a pool is needed.
+_match_pool = None
+
+
+def _get_match_pool():
+    """Shared matching pool (a ThreadPoolExecutor), or None on single-core machines."""
+    global _match_pool
+    if _match_pool is None and (os.cpu_count() or 1) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        _match_pool = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='match')
+    return _match_pool
+
+
+# How long a capture kept in an execute_actions() context may be reused (seconds).
+SCREEN_REUSE_MAX_AGE = 0.1
+
+# Last best match per element (or fallback name): (image path, top-left x, y in capture
+# coordinates, time.monotonic()). Its image is tried first; while the hit is recent, the
+# area around it is searched before the whole screen.
+_last_match: Dict[str, Tuple[str, int, int, float]] = {}
+LAST_MATCH_MAX_AGE = 2.0
+
+
+def _match_near(screen_bgr, template, x: int, y: int, confidence: float):
+    """Like _match_template(), but only for top-left positions within one template size of (x, y)."""
+    h, w = template.shape[:2]
+    x0 = max(0, x - w)
+    y0 = max(0, y - h)
+    x1 = min(screen_bgr.shape[1] - w, x + w)
+    y1 = min(screen_bgr.shape[0] - h, y + h)
+    if x1 < x0 or y1 < y0:
+        return np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0, np.float32)
+    result = cv2.matchTemplate(screen_bgr[y0:y1 + h, x0:x1 + w], template, cv2.TM_CCOEFF_NORMED)
+    ys, xs = np.nonzero(result >= confidence)
+    return xs + x0, ys + y0, result[ys, xs]
+
+
+def find_element_on_screen(name: str, confidence: float = 0.8,
+                           context: Optional[Dict] = None,
+                           early_exit_score: float = 0.95) -> Tuple[Optional[Tuple[int, int]], str, Dict]:
     """
     Finds an element by image on screen (template matching).
     ALWAYS uses image search, NEVER fixed coordinates.
@@ -180,10 +536,15 @@ def find_element_on_screen(name: str, confidence: float = 0.8) -> Tuple[Optional
     If not present in JSON, searches by name pattern in captures/.
     
     If there are multiple matches, returns the one with highest confidence.
+    Remaining images are skipped once a match scores >= early_exit_score.
     
     Args:
         name: Element name to search
         confidence: Confidence threshold (0.0 to 1.0)
+        context: Optional dict shared across back-to-back checks; a fresh capture
+            stored there (key 'screen') is reused instead of grabbing the screen again,
+            and its 'elements' snapshot, if any, is used instead of re-checking the file
+        early_exit_score: Stop testing further images once the best score reaches this
     
     Returns: (coordinates, method_used, extra_info)
     - If found by image: ((x, y), 'image', {matches_found, best_score, images_tested})
@@ -197,10 +558,10 @@ def find_element_on_screen(name: str, confidence: float = 0.8) -> Tuple[Optional
         "element_config": None
     }
     
-    if not HAS_PYAUTOGUI:
+    if not _load_pyautogui():
         return None, 'no_pyautogui', info
     
-    if not HAS_CV2:
+    if not _load_cv2():
         return None, 'no_cv2', info
     
     # Normalize name
@@ -209,7 +570,7 @@ def find_element_on_screen(name: str, confidence: float = 0.8) -> Tuple[Optional
     # ============================================
     # STEP 1: Check configuration in elements.json
     # ============================================
-    element = get_element(name)
+    element = get_element(name, context.get('elements') if context is not None else None)
     
     image_files = []
     
@@ -223,38 +584,47 @@ def find_element_on_screen(name: str, confidence: float = 0.8) -> Tuple[Optional
     
     # If JSON has no images, search by pattern (fallback)
     if not image_files:
+        names, lowered_names = _list_captures()
         patterns = [
-            os.path.join(CAPTURES_DIR, f"{name_normalized}.png"),
-            os.path.join(CAPTURES_DIR, f"{name_normalized}_*.png"),
-            os.path.join(CAPTURES_DIR, f"{name.replace(' ', '_')}.png"),
-            os.path.join(CAPTURES_DIR, f"{name.replace(' ', '_')}_*.png"),
+            f"{name_normalized}.png",
+            f"{name_normalized}_*.png",
+            f"{name.replace(' ', '_')}.png",
+            f"{name.replace(' ', '_')}_*.png",
         ]
+        matched = []
+        for pattern in patterns:
+            matched.extend(fnmatch.filter(names, pattern))
         
         # Try partial matches if name has multiple words
         words = name_normalized.split('_')
         if len(words) > 1:
-            all_files = glob.glob(os.path.join(CAPTURES_DIR, "*.png"))
-            for f in all_files:
-                fname = os.path.basename(f).lower()
-                if all(word in fname for word in words):
-                    patterns.append(f)
-        
-        for pattern in patterns:
-            image_files.extend(glob.glob(pattern))
+            # One anchored lookahead per word: the name contains every word, in any order
+            has_all_words = re.compile(''.join(f'(?=.*{re.escape(word)})' for word in words)).match
+            matched.extend(fname for fname, lowered in zip(names, lowered_names) if has_all_words(lowered))
         
-        # Remove duplicates
-        image_files = list(dict.fromkeys(image_files))
-    
-    info["images_tested"] = len(image_files)
-    
-    # Capture full-screen screenshot
-    try:
-        screenshot = pyautogui.screenshot()
-        screen_np = np.array(screenshot)
-        # Convert RGB to BGR (OpenCV format)
-        screen_bgr = cv2.cvtColor(screen_np, cv2.COLOR_RGB2BGR)
-    except Exception as e:
-        return None, 'screenshot_error', info
+        # Remove duplicates (order matters: ties keep the first image's match)
+        image_files = list(dict.fromkeys(os.path.join(CAPTURES_DIR, f) for f in matched))
+    
+    # Try the image that matched last time first, so a good hit can end the search early
+    memo_key = element['name'] if element else name_normalized
+    last = _last_match.get(memo_key)
+    if last is not None and last[0] in image_files[1:]:
+        image_files.remove(last[0])
+        image_files.insert(0, last[0])
+    
+    # Capture full-screen screenshot (or reuse the context's, if still fresh)
+    frame = context.get('screen') if context is not None else None
+    if frame is None or time.monotonic() - frame[-1] > SCREEN_REUSE_MAX_AGE:
+        try:
+            screen_bgr, origin = _grab_screen()
+            screen_gray = cv2.cvtColor(screen_bgr, cv2.COLOR_BGR2GRAY)
+            screen_gray_half = cv2.pyrDown(screen_gray)
+        except Exception as e:
+            return None, 'screenshot_error', info
+        frame = (screen_bgr, origin, screen_gray, screen_gray_half, time.monotonic())
+        if context is not None:
+            context['screen'] = frame
+    screen_bgr, (origin_x, origin_y), screen_gray, screen_gray_half, _ = frame
     
     # ============================================
     # STEP 2: Search the target element
@@ -262,56 +632,89 @@ def find_element_on_screen(name: str, confidence: float = 0.8) -> Tuple[Optional
     best_match = None
     best_confidence = 0
     
-    for img_path in image_files:
+    def match_one(img_path):
         try:
-            # Load template in color for better accuracy
-            template = cv2.imread(img_path, cv2.IMREAD_COLOR)
-            if template is None:
-                continue
-            
-            h, w = template.shape[:2]
-            
-            # Run color template matching
-            result = cv2.matchTemplate(screen_bgr, template, cv2.TM_CCOEFF_NORMED)
-            
-            # Find all locations above threshold
-            locations = np.where(result >= confidence)
-            
-            # Count matches for this image
-            matches_for_this_image = len(locations[0])
-            if matches_for_this_image > 0:
-                info["matches_found"] += matches_for_this_image
-            
-            # For each location, get exact score
-            for pt in zip(*locations[::-1]):  # [::-1] swaps to (x, y)
-                match_confidence = result[pt[1], pt[0]]
-                
-                # Compute center of the match
-                center_x = int(pt[0] + w // 2)
-                center_y = int(pt[1] + h // 2)
-                
-                # Record all matches
-                info["all_matches"].append({
-                    "x": center_x,
-                    "y": center_y,
-                    "score": float(match_confidence),
-                    "image": os.path.basename(img_path)
-                })
-                
-                # Keep the best match
-                if match_confidence > best_confidence:
-                    best_confidence = float(match_confidence)
-                    best_match = (center_x, center_y)
-        
+            loaded = _load_template(img_path)
+            if loaded is None:
+                return None
+            template, probe = loaded
+            # Run color template matching (coarse-to-fine)
+            return template.shape[:2], _match_template(screen_bgr, screen_gray, screen_gray_half,
+                                                       template, probe, confidence)
         except Exception as e:
             # Continue with next image on error
+            return None
+    
+    def matched_images():
+        # The first image runs alone; only if it isn't good enough are the rest matched
+        # (concurrently when there are several).
+        yield image_files[0], match_one(image_files[0])
+        rest = image_files[1:]
+        pool = _get_match_pool() if len(rest) > 1 else None
+        yield from zip(rest, pool.map(match_one, rest) if pool else map(match_one, rest))
+    
+    def near_last_match():
+        # Only a hit good enough to stop the search counts; otherwise the full search runs
+        # (and reports all matches) as usual.
+        img_path, x, y, when = last
+        if time.monotonic() - when > LAST_MATCH_MAX_AGE:
+            return None
+        loaded = _load_template(img_path)
+        if loaded is None:
+            return None
+        result = _match_near(screen_bgr, loaded[0], x, y, confidence)
+        if not len(result[2]) or result[2].max() < early_exit_score:
+            return None
+        return [(img_path, (loaded[0].shape[:2], result))]
+    
+    candidates = None
+    if last is not None and image_files and image_files[0] == last[0]:
+        try:
+            candidates = near_last_match()
+        except Exception as e:
+            candidates = None
+    if candidates is None:
+        candidates = matched_images() if image_files else ()
+    
+    # Merge in image order, so ties keep the first image's match
+    best_image = None
+    best_pos = None
+    for img_path, result in candidates:
+        info["images_tested"] += 1
+        if result is None:
             continue
+        (h, w), (xs, ys, scores) = result
+        
+        if not len(scores):
+            continue
+        info["matches_found"] += len(scores)
+        
+        # Match centers in screen coordinates, computed for all matches at once
+        centers_x = (xs + (w // 2 + origin_x)).tolist()
+        centers_y = (ys + (h // 2 + origin_y)).tolist()
+        score_list = scores.tolist()
+        image_name = os.path.basename(img_path)
+        info["all_matches"].extend(
+            {"x": cx, "y": cy, "score": sc, "image": image_name}
+            for cx, cy, sc in zip(centers_x, centers_y, score_list)
+        )
+        
+        # Keep the best match (argmax takes the first of equal scores)
+        k = int(np.argmax(scores))
+        if score_list[k] > best_confidence:
+            best_confidence = score_list[k]
+            best_match = (centers_x[k], centers_y[k])
+            best_image = img_path
+            best_pos = (int(xs[k]), int(ys[k]))
+        if best_confidence >= early_exit_score:
+            break
     
     # Sort matches by score (descending)
     info["all_matches"].sort(key=lambda x: x["score"], reverse=True)
     info["best_score"] = best_confidence
     
     if best_match:
+        _last_match[memo_key] = (best_image, *best_pos, time.monotonic())
         return best_match, 'image', info
     
     # NO CSV fallback - image search only
@@ -325,11 +728,9 @@ def search_elements(query: str) -> List[Dict]:
     query_lower = query.lower()
     results = []
     
-    for key, elem in elements.items():
+    for key, (_, elem_name, desc, _, tags) in _lowered_elements(elements).items():
+        elem = elements[key]
         score = 0
-        elem_name = elem['name'].lower()
-        desc = elem.get('description', '').lower()
-        tags = ' '.join(elem.get('tags', [])).lower()
         
         if query_lower == elem_name:
             score = 100
@@ -391,20 +792,6 @@ HUMAN_MOVEMENT_CONFIG = {
 }
 
 
-def _bezier_curve(t: float, p0: tuple, p1: tuple, p2: tuple, p3: tuple) -> tuple:
-    """Computes a point on a cubic Bezier curve."""
-    u = 1 - t
-    tt = t * t
-    uu = u * u
-    uuu = uu * u
-    ttt = tt * t
-    
-    x = uuu * p0[0] + 3 * uu * t * p1[0] + 3 * u * tt * p2[0] + ttt * p3[0]
-    y = uuu * p0[1] + 3 * uu * t * p1[1] + 3 * u * tt * p2[1] + ttt * p3[1]
-    
-    return (x, y)
-
-
 def _generate_control_points(start: tuple, end: tuple) -> tuple:
     """Generates random control points for the Bezier curve."""
     cfg = HUMAN_MOVEMENT_CONFIG
@@ -439,31 +826,111 @@ def _generate_control_points(start: tuple, end: tuple) -> tuple:
     return (p1, p2)
 
 
-def _apply_jitter(x: float, y: float) -> tuple:
-    """Applies small random jitter offsets to a position."""
-    cfg = HUMAN_MOVEMENT_CONFIG
-    
-    if random.random() < cfg['jitter_frequency']:
-        jitter_amount = random.uniform(cfg['jitter_min'], cfg['jitter_max'])
-        angle = random.uniform(0, 2 * math.pi)
-        x += jitter_amount * math.cos(angle)
-        y += jitter_amount * math.sin(angle)
+def _humanized_path(start: tuple, end: tuple, p1: tuple, p2: tuple, num_steps: int) -> List[Tuple[int, int]]:
+    """
+    Eased, jittered Bezier path (num_steps + 1 integer points), computed before moving.
     
-    return (x, y)
+    Easing (ease-in-out), the cubic Bezier and jitter are inlined, with config values and
+    math/random functions bound to locals, since this runs once per step.
+    """
+    cfg = HUMAN_MOVEMENT_CONFIG
+    jitter_freq = cfg['jitter_frequency']
+    jitter_min = cfg['jitter_min']
+    jitter_max = cfg['jitter_max']
+    rand = random.random
+    uniform = random.uniform
+    cos = math.cos
+    sin = math.sin
+    two_pi = 2 * math.pi
+    p0x, p0y = start
+    p1x, p1y = p1
+    p2x, p2y = p2
+    p3x, p3y = end
+    
+    path = []
+    append = path.append
+    for i in range(num_steps + 1):
+        t = i / num_steps
+        # Easing for non-linear speed (ease-in-out)
+        if t < 0.5:
+            t = 2 * t * t
+        else:
+            t = 1 - pow(-2 * t + 2, 2) / 2
+        
+        # Point on the cubic Bezier curve
+        u = 1 - t
+        tt = t * t
+        uu = u * u
+        uuu = uu * u
+        ttt = tt * t
+        x = uuu * p0x + 3 * uu * t * p1x + 3 * u * tt * p2x + ttt * p3x
+        y = uuu * p0y + 3 * uu * t * p1y + 3 * u * tt * p2y + ttt * p3y
+        
+        # Jitter: small random offsets to simulate hand tremor
+        if rand() < jitter_freq:
+            jitter_amount = uniform(jitter_min, jitter_max)
+            angle = uniform(0, two_pi)
+            x += jitter_amount * cos(angle)
+            y += jitter_amount * sin(angle)
+        
+        append((int(x), int(y)))
+    return path
 
 
-def _easing_function(t: float) -> float:
-    """Easing function for non-linear speed (ease-in-out)."""
-    if t < 0.5:
-        return 2 * t * t
-    else:
-        return 1 - pow(-2 * t + 2, 2) / 2
+# Step pacing sleeps until this long before each deadline, then spins on perf_counter().
+PACING_SPIN_WINDOW = 0.002
+_timer_resolution_raised = False
+
+
+def _raise_timer_resolution():
+    """On Windows, requests 1 ms timer resolution (released at exit) for step pacing."""
+    global _timer_resolution_raised
+    if _timer_resolution_raised or sys.platform != 'win32':
+        return
+    _timer_resolution_raised = True
+    try:
+        import atexit
+        import ctypes
+        winmm = ctypes.windll.winmm
+        if winmm.timeBeginPeriod(1) == 0:
+            atexit.register(winmm.timeEndPeriod, 1)
+    except (ImportError, AttributeError, OSError):
+        pass
+
+
+def _sleep_until(deadline: float):
+    """Waits until perf_counter() reaches deadline: a coarse sleep, then a short spin."""
+    perf_counter = time.perf_counter
+    remaining = deadline - perf_counter()
+    if remaining > PACING_SPIN_WINDOW:
+        time.sleep(remaining - PACING_SPIN_WINDOW)
+    while perf_counter() < deadline:
+        pass
+
+
+def _cursor_mover():
+    """Returns move(x, y) for stepping through a precomputed path."""
+    # Public API only (pyautogui's platform backends are private); _pause=False because
+    # move_smooth() does its own pacing between steps.
+    return lambda px, py: pyautogui.moveTo(px, py, _pause=False)
 
 
 # ============================================
 # MOUSE FUNCTIONS
 # ============================================
 
+# Where move_smooth() last left the cursor and when (time.monotonic()). The next move starts
+# from there instead of querying position(), unless more than MOUSE_POS_TRUST seconds have
+# passed (the user may have moved the mouse meanwhile).
+MOUSE_POS_TRUST = 1.0
+_last_mouse_pos: Optional[Tuple[Tuple[float, float], float]] = None
+
+
+def _remember_mouse_pos(x, y):
+    global _last_mouse_pos
+    _last_mouse_pos = ((float(x), float(y)), time.monotonic())
+
+
 def move_smooth(x: int, y: int, duration: float = 0.5, humanize: bool = True):
     """
     Moves the mouse smoothly with human-like movement.
@@ -475,14 +942,17 @@ def move_smooth(x: int, y: int, duration: float = 0.5, humanize: bool = True):
     - Random micro-pauses
     - Optional overshoot and correction
     """
-    if not HAS_PYAUTOGUI:
+    if not _load_pyautogui():
         error("pyautogui not available")
     
     cfg = HUMAN_MOVEMENT_CONFIG
     
-    # Get current position
-    start_pos = pyautogui.position()
-    start = (start_pos.x, start_pos.y)
+    # Get current position (trusting where the previous move ended, if recent)
+    if _last_mouse_pos is not None and time.monotonic() - _last_mouse_pos[1] <= MOUSE_POS_TRUST:
+        start = _last_mouse_pos[0]
+    else:
+        start_pos = pyautogui.position()
+        start = (start_pos.x, start_pos.y)
     end = (float(x), float(y))
     
     # Compute distance
@@ -493,11 +963,13 @@ def move_smooth(x: int, y: int, duration: float = 0.5, humanize: bool = True):
     # If distance is very small, move directly
     if distance < 5:
         pyautogui.moveTo(x, y)
+        _remember_mouse_pos(x, y)
         return
     
     if not humanize:
         # Simple linear movement (legacy)
         pyautogui.moveTo(x, y, duration=duration)
+        _remember_mouse_pos(x, y)
         return
     
     # Apply speed variance
@@ -511,27 +983,21 @@ def move_smooth(x: int, y: int, duration: float = 0.5, humanize: bool = True):
     num_steps = max(int(actual_duration * cfg['steps_per_second']), 10)
     step_duration = actual_duration / num_steps
     
-    # Execute movement
-    for i in range(num_steps + 1):
-        t = i / num_steps
-        
-        # Apply easing for non-linear speed
-        t_eased = _easing_function(t)
-        
-        # Compute position on Bezier curve
-        pos = _bezier_curve(t_eased, start, p1, p2, end)
-        
-        # Apply jitter
-        pos = _apply_jitter(pos[0], pos[1])
-        
-        # Move the mouse
-        pyautogui.moveTo(int(pos[0]), int(pos[1]), _pause=False)
+    # Execute movement: the whole path is computed first, so each timed step is just
+    # a cursor move plus its pause. Pauses advance an absolute deadline, so sleep
+    # overshoot doesn't accumulate over the steps.
+    _raise_timer_resolution()
+    move = _cursor_mover()
+    deadline = time.perf_counter()
+    for px, py in _humanized_path(start, end, p1, p2, num_steps):
+        move(px, py)
         
         # Random micro-pause
         if random.random() < cfg['micropause_chance']:
-            time.sleep(random.uniform(cfg['micropause_min'], cfg['micropause_max']))
+            deadline += random.uniform(cfg['micropause_min'], cfg['micropause_max'])
         else:
-            time.sleep(step_duration)
+            deadline += step_duration
+        _sleep_until(deadline)
     
     # Overshoot and correction
     if random.random() < cfg['overshoot_chance']:
@@ -553,11 +1019,12 @@ def move_smooth(x: int, y: int, duration: float = 0.5, humanize: bool = True):
     else:
         # Ensure we end exactly at the target
         pyautogui.moveTo(x, y, _pause=False)
+    _remember_mouse_pos(x, y)
 
 
 def do_click(x: int = None, y: int = None, button: str = 'left', duration: float = 0.5):
     """Clicks at position (smooth move if a position is provided)."""
-    if not HAS_PYAUTOGUI:
+    if not _load_pyautogui():
         error("pyautogui not available")
     
     if x is not None and y is not None:
@@ -570,7 +1037,7 @@ def do_click(x: int = None, y: int = None, button: str = 'left', duration: float
 
 def do_double_click(x: int = None, y: int = None, duration: float = 0.5):
     """Double-click."""
-    if not HAS_PYAUTOGUI:
+    if not _load_pyautogui():
         error("pyautogui not available")
     
     if x is not None and y is not None:
@@ -583,7 +1050,7 @@ def do_double_click(x: int = None, y: int = None, duration: float = 0.5):
 
 def do_drag(x1: int, y1: int, x2: int, y2: int, duration: float = 0.5):
     """Drags from one point to another with human-like movement."""
-    if not HAS_PYAUTOGUI:
+    if not _load_pyautogui():
         error("pyautogui not available")
     
     # Move to start point with human-like movement
@@ -604,7 +1071,7 @@ def do_drag(x1: int, y1: int, x2: int, y2: int, duration: float = 0.5):
 
 def do_scroll(amount: int, x: int = None, y: int = None):
     """Scroll (with human-like movement if position is provided)."""
-    if not HAS_PYAUTOGUI:
+    if not _load_pyautogui():
         error("pyautogui not available")
     
     if x is not None and y is not None:
@@ -622,6 +1089,9 @@ def do_scroll(amount: int, x: int = None, y: int = None):
 
 def remove_accents(text: str) -> str:
     """Removes accents and diacritics from text."""
+    if text.isascii():
+        # Nothing to decompose or strip
+        return text
     # Normalize to NFD (split base characters and diacritics)
     nfd = unicodedata.normalize('NFD', text)
     # Keep only characters that are not diacritic marks
@@ -630,7 +1100,7 @@ def remove_accents(text: str) -> str:
 
 def do_write(text: str, interval: float = 0.0):
     """Types text (without accents to reduce issues). Handles new lines with Shift+Enter."""
-    if not HAS_PYAUTOGUI:
+    if not _load_pyautogui():
         error("pyautogui not available")
     
     # Remove accents before typing
@@ -656,7 +1126,7 @@ def do_write(text: str, interval: float = 0.0):
 
 def do_press(key: str):
     """Presses a key."""
-    if not HAS_PYAUTOGUI:
+    if not _load_pyautogui():
         error("pyautogui not available")
     pyautogui.press(key)
     sound_key()  # Audio feedback
@@ -664,7 +1134,7 @@ def do_press(key: str):
 
 def do_hotkey(*keys):
     """Key combination."""
-    if not HAS_PYAUTOGUI:
+    if not _load_pyautogui():
         error("pyautogui not available")
     pyautogui.hotkey(*keys)
     sound_hotkey()  # Audio feedback
@@ -679,24 +1149,98 @@ def get_sequence_path(name: str) -> str:
     return os.path.join(SEQUENCES_DIR, f"{name}.json")
 
 
+def get_sequence_log_path(name: str) -> str:
+    """Gets the path of the sequence's append log (actions added since the last save)."""
+    return os.path.join(SEQUENCES_DIR, f"{name}.seqlog")
+
+
+# Once the append log outgrows this, the next append folds it into the sequence file.
+SEQUENCE_LOG_MAX_BYTES = 64 * 1024
+
+# Parsed sequences: name -> ((file stamp, log stamp), data), reused while both are
+# unchanged. As with elements, the dicts are shared: callers that mutate one must
+# save_sequence() or append_sequence_actions() it.
+_sequence_cache: Dict[str, Tuple[Tuple, Dict]] = {}
+
+
+def _replay_sequence_log(data: Dict, log_path: str):
+    """Applies append-log records to a sequence loaded from its file."""
+    with open(log_path, 'rb') as f:
+        lines = f.read().splitlines()
+    actions = data.setdefault('actions', [])
+    for line in lines:
+        try:
+            record = orjson.loads(line) if orjson is not None else json.loads(line)
+        except ValueError:
+            continue  # Torn record from an interrupted append; later ones are still valid
+        # Records are positional: one already folded into the file (crash between
+        # save and log removal) is skipped instead of duplicated
+        if record['at'] < len(actions):
+            continue
+        actions.extend(record['actions'])
+        data['updated'] = record['updated']
+
+
 def load_sequence(name: str) -> Optional[Dict]:
-    """Loads a sequence."""
+    """Loads a sequence plus its append log (cached until either changes on disk)."""
     path = get_sequence_path(name)
-    if not os.path.exists(path):
+    stamp = _file_stamp(path)
+    if stamp is None:
+        _sequence_cache.pop(name, None)
         return None
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    log_path = get_sequence_log_path(name)
+    key = (stamp, _file_stamp(log_path))
+    cached = _sequence_cache.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    data = _read_json(path)
+    if key[1] is not None:
+        _replay_sequence_log(data, log_path)
+    _sequence_cache[name] = (key, data)
+    return data
 
 
 def save_sequence(name: str, data: Dict):
-    """Saves a sequence."""
+    """Saves a sequence, folding in (and removing) its append log."""
     path = get_sequence_path(name)
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    _write_json(path, data)
+    try:
+        os.remove(get_sequence_log_path(name))
+    except FileNotFoundError:
+        pass
+    _sequence_cache[name] = ((_file_stamp(path), None), data)
+
+
+def append_sequence_actions(name: str, seq: Dict, actions: List[Dict]):
+    """Adds actions to a loaded sequence by appending one record to its log, so each
+    add costs a small write instead of rewriting the whole file."""
+    record = {"at": len(seq['actions']), "actions": actions, "updated": datetime.now().isoformat()}
+    if orjson is not None:
+        payload = orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    else:
+        payload = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+    seq['actions'].extend(actions)
+    seq['updated'] = record['updated']
+    log_path = get_sequence_log_path(name)
+    with open(log_path, 'a+b') as f:
+        # An interrupted append can leave a line without its newline; start a fresh line
+        # so this record is not glued onto the torn one
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                payload = b'\n' + payload
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+        log_size = f.tell()
+    if log_size > SEQUENCE_LOG_MAX_BYTES:
+        save_sequence(name, seq)
+    else:
+        _sequence_cache[name] = ((_file_stamp(get_sequence_path(name)), _file_stamp(log_path)), seq)
 
 
-def execute_action(action: Dict) -> Dict:
-    """Executes one action."""
+def execute_action(action: Dict, context: Optional[Dict] = None) -> Dict:
+    """Executes one action (context: see find_element_on_screen)."""
     action_type = action.get('type', '')
     result = {"action": action_type, "success": True}
     
@@ -706,7 +1250,7 @@ def execute_action(action: Dict) -> Dict:
             result['coordinates'] = {"x": action['x'], "y": action['y']}
             
         elif action_type == 'move-to':
-            coords, method, info = find_element_on_screen(action['target'], action.get('confidence', 0.8))
+            coords, method, info = find_element_on_screen(action['target'], action.get('confidence', 0.8), context)
             if not coords:
                 return {"success": False, "error": f"Element not found: {action['target']}", **info}
             move_smooth(coords[0], coords[1], action.get('duration', 0.5))
@@ -720,7 +1264,7 @@ def execute_action(action: Dict) -> Dict:
             result['coordinates'] = {"x": action.get('x'), "y": action.get('y')}
             
         elif action_type == 'click-on':
-            coords, method, info = find_element_on_screen(action['target'], action.get('confidence', 0.8))
+            coords, method, info = find_element_on_screen(action['target'], action.get('confidence', 0.8), context)
             if not coords:
                 return {"success": False, "error": f"Element not found: {action['target']}", **info}
             do_click(coords[0], coords[1], action.get('button', 'left'))
@@ -764,7 +1308,7 @@ def execute_action(action: Dict) -> Dict:
             result['seconds'] = action.get('seconds', 1)
             
         elif action_type == 'screenshot':
-            if HAS_PYAUTOGUI:
+            if _load_pyautogui():
                 filename = action.get('filename', f"screenshot_{int(time.time())}")
                 filepath = os.path.join(CAPTURES_DIR, f"{filename}.png")
                 pyautogui.screenshot(filepath)
@@ -783,18 +1327,22 @@ def execute_action(action: Dict) -> Dict:
     return result
 
 
-def is_element_visible(name: str, confidence: float = 0.8) -> Tuple[bool, Dict]:
+def is_element_visible(name: str, confidence: float = 0.8,
+                       context: Optional[Dict] = None) -> Tuple[bool, Dict]:
     """Checks if an element is visible on screen without clicking.
     
     Returns: (visible, info)
     """
-    coords, method, info = find_element_on_screen(name, confidence)
+    coords, method, info = find_element_on_screen(name, confidence, context)
     return coords is not None, info
 
 
 def execute_actions(actions: List[Dict]) -> List[Dict]:
     """Executes a list of actions with if-visible conditional support."""
     results = []
+    # One elements snapshot for the whole run. Back-to-back lookups share one screen
+    # capture; any executed action drops it.
+    context: Dict[str, Any] = {'elements': load_elements()}
     i = 0
     while i < len(actions):
         action = actions[i]
@@ -807,7 +1355,7 @@ def execute_actions(actions: List[Dict]) -> List[Dict]:
             else_actions = action.get('else', [])
             
             # Check element visibility
-            visible, info = is_element_visible(target, action.get('confidence', 0.8))
+            visible, info = is_element_visible(target, action.get('confidence', 0.8), context)
             
             # Determine which branch to execute
             if action_type == 'if-visible':
@@ -831,7 +1379,8 @@ def execute_actions(actions: List[Dict]) -> List[Dict]:
             # Execute the selected branch
             branch_actions = then_actions if condition_met else else_actions
             for branch_action in branch_actions:
-                branch_result = execute_action(branch_action)
+                branch_result = execute_action(branch_action, context)
+                context.pop('screen', None)
                 branch_result['step'] = i + 1
                 branch_result['branch'] = "then" if condition_met else "else"
                 results.append(branch_result)
@@ -840,7 +1389,8 @@ def execute_actions(actions: List[Dict]) -> List[Dict]:
                     return results
         else:
             # Normal action
-            result = execute_action(action)
+            result = execute_action(action, context)
+            context.pop('screen', None)
             result['step'] = i + 1
             results.append(result)
             if not result.get('success', True):
@@ -987,7 +1537,7 @@ def cmd_hotkey(args):
 
 def cmd_mouse_pos(args):
     """Current mouse position."""
-    if HAS_PYAUTOGUI:
+    if _load_pyautogui():
         pos = pyautogui.position()
         output({"action": "mouse-pos", "x": pos.x, "y": pos.y})
     else:
@@ -1023,9 +1573,14 @@ def cmd_region_capture(args):
     try:
         # Run the region capture script.
         # By default it saves to the skill's data/local/.
+        # close_fds=False (with no cwd/preexec_fn) lets CPython use posix_spawn(), which
+        # glibc implements with a vfork-style clone instead of copying this interpreter's
+        # page tables for fork+exec. Python opens its fds non-inheritable, so the child
+        # still only gets stdin/stdout/stderr.
         result = subprocess.run(
             [sys.executable, script_path, "--data-dir", DATA_DIR],
-            capture_output=False
+            capture_output=False,
+            close_fds=False,
         )
         output({
             "success": result.returncode == 0,
@@ -1040,13 +1595,14 @@ def cmd_region_capture(args):
 def cmd_run(args):
     """Execute actions from JSON."""
     try:
-        data = json.loads(args.json_str)
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, handled below
+        data = orjson.loads(args.json_str) if orjson is not None else json.loads(args.json_str)
         actions = data.get('actions', [data] if 'type' in data else [])
         results = execute_actions(actions)
         output({
             "action": "run",
             "total": len(actions),
-            "completed": len([r for r in results if r.get('success')]),
+            "completed": sum(1 for r in results if r.get('success')),
             "results": results
         })
     except json.JSONDecodeError as e:
@@ -1072,35 +1628,41 @@ def cmd_seq_create(args):
     })
 
 
+def _take_ints(rest: str, n: int) -> List[int]:
+    """First n whitespace-separated integers of rest."""
+    values = [int(v) for v in rest.split()[:n]]
+    if len(values) < n:
+        raise ValueError(f"expected {n} integers, got {len(values)}")
+    return values
+
+
+# Fields parse_simple_action() reads from the text after the action type.
+_XY_FIELDS = lambda rest: dict(zip(('x', 'y'), _take_ints(rest, 2)))
+_ACTION_FIELDS = {
+    'click-on': lambda rest: {'target': rest},
+    'move-to': lambda rest: {'target': rest},
+    'write': lambda rest: {'text': rest.strip("'\"")},
+    'press': lambda rest: {'key': rest},
+    'hotkey': lambda rest: {'keys': rest.split()},
+    'wait': lambda rest: {'seconds': float(rest)},
+    'click': _XY_FIELDS,
+    'double-click': _XY_FIELDS,
+    'right-click': _XY_FIELDS,
+    'move': _XY_FIELDS,
+    'scroll': lambda rest: {'amount': int(rest)},
+    'drag': lambda rest: dict(zip(('x1', 'y1', 'x2', 'y2'), _take_ints(rest, 4))),
+}
+
+
 def parse_simple_action(action_str: str) -> Dict:
     """Parses a simple action from string."""
     parts = action_str.split(maxsplit=1)
     action_type = parts[0]
     action = {"type": action_type}
     
-    if len(parts) > 1:
-        rest = parts[1]
-        
-        if action_type in ('click-on', 'move-to'):
-            action['target'] = rest
-        elif action_type == 'write':
-            action['text'] = rest.strip("'\"")
-        elif action_type == 'press':
-            action['key'] = rest
-        elif action_type == 'hotkey':
-            action['keys'] = rest.split()
-        elif action_type == 'wait':
-            action['seconds'] = float(rest)
-        elif action_type in ('click', 'double-click', 'right-click', 'move'):
-            coords = rest.split()
-            action['x'] = int(coords[0])
-            action['y'] = int(coords[1])
-        elif action_type == 'scroll':
-            action['amount'] = int(rest)
-        elif action_type == 'drag':
-            coords = rest.split()
-            action['x1'], action['y1'] = int(coords[0]), int(coords[1])
-            action['x2'], action['y2'] = int(coords[2]), int(coords[3])
+    fields = _ACTION_FIELDS.get(action_type)
+    if fields is not None and len(parts) > 1:
+        action.update(fields(parts[1]))
     
     return action
 
@@ -1143,9 +1705,7 @@ def cmd_seq_add(args):
         # Regular action
         action = parse_simple_action(args.action)
     
-    seq['actions'].append(action)
-    seq['updated'] = datetime.now().isoformat()
-    save_sequence(args.name, seq)
+    append_sequence_actions(args.name, seq, [action])
     
     output({
         "action": "seq-add",
@@ -1155,6 +1715,37 @@ def cmd_seq_add(args):
     })
 
 
+def cmd_seq_add_many(args):
+    """Add several actions (one per line) to a sequence with a single write."""
+    seq = load_sequence(args.name)
+    if not seq:
+        error(f"Sequence not found: {args.name}")
+    
+    if args.file == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    
+    actions = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.split(maxsplit=1)[0] in ('if-visible', 'if-not-visible'):
+            error(f"Conditionals need --then/--else; use seq-add for: {line}")
+        actions.append(parse_simple_action(line))
+    
+    append_sequence_actions(args.name, seq, actions)
+    
+    output({
+        "action": "seq-add-many",
+        "sequence": args.name,
+        "added": len(actions),
+        "total_actions": len(seq['actions'])
+    })
+
+
 def cmd_seq_show(args):
     """Show sequence."""
     seq = load_sequence(args.name)
@@ -1170,51 +1761,104 @@ def cmd_seq_run(args):
         error(f"Sequence not found: {args.name}")
     
     results = execute_actions(seq['actions'])
+    if os.path.exists(get_sequence_log_path(args.name)):
+        # Fold actions added since the last save into the sequence file, after the run
+        save_sequence(args.name, seq)
     output({
         "action": "seq-run",
         "sequence": args.name,
         "total": len(seq['actions']),
-        "completed": len([r for r in results if r.get('success')]),
+        "completed": sum(1 for r in results if r.get('success')),
         "results": results
     })
 
 
+# seq-list preview text per action type; other types show just the type.
+_ACTION_PREVIEW = {
+    'click-on': lambda act: f"click:{act.get('target', '?')}",
+    'wait': lambda act: f"wait:{act.get('seconds', 0)}s",
+    'write': lambda act: f"write:{act.get('text', '')[:10]}...",
+    'press': lambda act: f"press:{act.get('key', '?')}",
+    'hotkey': lambda act: f"hotkey:{'+'.join(act.get('keys', []))}",
+}
+
+
+def _sequence_summary(seq: Dict) -> Dict:
+    """The seq-list entry for a sequence: metadata plus a preview of its first actions."""
+    actions = seq.get('actions', [])
+    
+    # Action summary (first 5 actions)
+    preview = _ACTION_PREVIEW.get
+    action_summary = []
+    for act in actions[:5]:
+        fmt = preview(act['type'])
+        action_summary.append(fmt(act) if fmt else act['type'])
+    
+    if len(actions) > 5:
+        action_summary.append(f"...+{len(actions)-5} more")
+    
+    return {
+        "name": seq['name'],
+        "display_name": seq.get('display_name', seq['name']),
+        "description": seq.get('description', ''),
+        "actions_count": len(actions),
+        "actions_preview": action_summary,
+        "created": seq.get('created', ''),
+        "updated": seq.get('updated', '')
+    }
+
+
+def _load_seq_index() -> Dict[str, list]:
+    """name -> [[mtime_ns, size], summary or None] from SEQUENCES_INDEX_FILE ({} if unusable)."""
+    try:
+        index = _read_json(SEQUENCES_INDEX_FILE)
+    except (OSError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+
 def cmd_seq_list(args):
     """List sequences with complete information."""
     sequences = []
-    if os.path.exists(SEQUENCES_DIR):
-        for f in os.listdir(SEQUENCES_DIR):
-            if f.endswith('.json'):
-                seq = load_sequence(f[:-5])
-                if seq:
-                    # Action summary
-                    action_summary = []
-                    for act in seq.get('actions', [])[:5]:  # First 5 actions
-                        if act['type'] == 'click-on':
-                            action_summary.append(f"click:{act.get('target', '?')}")
-                        elif act['type'] == 'wait':
-                            action_summary.append(f"wait:{act.get('seconds', 0)}s")
-                        elif act['type'] == 'write':
-                            action_summary.append(f"write:{act.get('text', '')[:10]}...")
-                        elif act['type'] == 'press':
-                            action_summary.append(f"press:{act.get('key', '?')}")
-                        elif act['type'] == 'hotkey':
-                            action_summary.append(f"hotkey:{'+'.join(act.get('keys', []))}")
-                        else:
-                            action_summary.append(act['type'])
-                    
-                    if len(seq.get('actions', [])) > 5:
-                        action_summary.append(f"...+{len(seq['actions'])-5} more")
-                    
-                    sequences.append({
-                        "name": seq['name'],
-                        "display_name": seq.get('display_name', seq['name']),
-                        "description": seq.get('description', ''),
-                        "actions_count": len(seq.get('actions', [])),
-                        "actions_preview": action_summary,
-                        "created": seq.get('created', ''),
-                        "updated": seq.get('updated', '')
-                    })
+    try:
+        it = os.scandir(SEQUENCES_DIR)
+    except FileNotFoundError:
+        it = None
+    if it is not None:
+        # Summaries come from the index while a file's (mtime_ns, size), plus its append
+        # log's, is unchanged, so listing costs one stat per file; only new or edited
+        # sequences are parsed.
+        index = _load_seq_index()
+        entries = {}
+        changed = False
+        with it:
+            # is_file() uses the type from the directory listing, no extra syscall
+            files = [entry for entry in it if entry.is_file()]
+        logs = {entry.name[:-7]: entry.stat() for entry in files if entry.name.endswith('.seqlog')}
+        for entry in files:
+            if not entry.name.endswith('.json'):
+                continue
+            name = entry.name[:-5]
+            st = entry.stat()
+            stamp = [st.st_mtime_ns, st.st_size]
+            log_st = logs.get(name)
+            if log_st is not None:
+                stamp += [log_st.st_mtime_ns, log_st.st_size]
+            cached = index.get(name)
+            if cached is not None and cached[0] == stamp:
+                summary = cached[1]
+            else:
+                seq = load_sequence(name) if log_st is not None else _read_json(entry.path)
+                summary = _sequence_summary(seq) if seq else None
+                changed = True
+            entries[name] = [stamp, summary]
+            if summary:
+                sequences.append(summary)
+        if changed or len(entries) != len(index):
+            try:
+                _write_json(SEQUENCES_INDEX_FILE, entries)
+            except OSError:
+                pass  # The index is only a cache
     
     output({
         "action": "seq-list", 
@@ -1229,6 +1873,10 @@ def cmd_seq_delete(args):
     path = get_sequence_path(args.name)
     if os.path.exists(path):
         os.remove(path)
+        try:
+            os.remove(get_sequence_log_path(args.name))
+        except FileNotFoundError:
+            pass
         output({"action": "seq-delete", "name": args.name, "success": True})
     else:
         error(f"Sequence not found: {args.name}")
@@ -1373,180 +2021,223 @@ def cmd_sounds_volume(args):
     })
 
 
-def main():
+class _SkippedParser:
+    """Stands in for subparsers that _build_parser() was asked not to build."""
+    
+    def add_argument(self, *args, **kwargs):
+        pass
+    
+    def set_defaults(self, **kwargs):
+        pass
+
+
+_SKIPPED_PARSER = _SkippedParser()
+
+
+def _build_parser(only: Optional[str] = None):
+    """Returns (parser, built subparsers by name). With only set, just that command's
+    subparser is built: setting up all of them costs more than importing this module."""
     parser = argparse.ArgumentParser(description="Macro Agent - UI control for AI agents")
+    fmt = parser.add_mutually_exclusive_group()
+    fmt.add_argument('--compact', dest='compact', action='store_const', const=True,
+                     help='Single-line JSON output (default when stdout is not a terminal)')
+    fmt.add_argument('--pretty', dest='compact', action='store_const', const=False,
+                     help='Indented JSON output (default on a terminal)')
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
+    def add_parser(name, **kwargs):
+        if only is not None and name != only:
+            return _SKIPPED_PARSER
+        return subparsers.add_parser(name, **kwargs)
+    
     # Search
-    p = subparsers.add_parser('search', help='Search elements')
+    p = add_parser('search', help='Search elements')
     p.add_argument('query', help='Text to search')
     p.set_defaults(func=cmd_search)
     
-    p = subparsers.add_parser('find', help='Find by name')
+    p = add_parser('find', help='Find by name')
     p.add_argument('name', help='Element name')
     p.set_defaults(func=cmd_find)
     
-    p = subparsers.add_parser('list', help='List elements')
+    p = add_parser('list', help='List elements')
     p.set_defaults(func=cmd_list)
     
-    p = subparsers.add_parser('near', help='Find near coordinates')
+    p = add_parser('near', help='Find near coordinates')
     p.add_argument('coords', help='X,Y coordinates')
     p.add_argument('--radius', type=int, default=100, help='Search radius')
     p.set_defaults(func=cmd_near)
     
-    p = subparsers.add_parser('stats', help='Statistics')
+    p = add_parser('stats', help='Statistics')
     p.set_defaults(func=cmd_stats)
     
     # Mouse
-    p = subparsers.add_parser('move', help='Move mouse')
+    p = add_parser('move', help='Move mouse')
     p.add_argument('x', type=int)
     p.add_argument('y', type=int)
     p.add_argument('--duration', type=float, default=0.5)
     p.set_defaults(func=cmd_move)
     
-    p = subparsers.add_parser('move-to', help='Move to element')
+    p = add_parser('move-to', help='Move to element')
     p.add_argument('name', help='Element name')
     p.add_argument('--duration', type=float, default=0.5)
     p.set_defaults(func=cmd_move_to)
     
-    p = subparsers.add_parser('click', help='Click at coordinates')
+    p = add_parser('click', help='Click at coordinates')
     p.add_argument('x', type=int)
     p.add_argument('y', type=int)
     p.set_defaults(func=cmd_click)
     
-    p = subparsers.add_parser('click-on', help='Click on element')
+    p = add_parser('click-on', help='Click on element')
     p.add_argument('name', help='Element name')
     p.set_defaults(func=cmd_click_on)
     
-    p = subparsers.add_parser('double-click', help='Double-click')
+    p = add_parser('double-click', help='Double-click')
     p.add_argument('x', type=int)
     p.add_argument('y', type=int)
     p.set_defaults(func=cmd_double_click)
     
-    p = subparsers.add_parser('right-click', help='Right-click')
+    p = add_parser('right-click', help='Right-click')
     p.add_argument('x', type=int)
     p.add_argument('y', type=int)
     p.set_defaults(func=cmd_right_click)
     
-    p = subparsers.add_parser('drag', help='Drag')
+    p = add_parser('drag', help='Drag')
     p.add_argument('x1', type=int)
     p.add_argument('y1', type=int)
     p.add_argument('x2', type=int)
     p.add_argument('y2', type=int)
     p.set_defaults(func=cmd_drag)
     
-    p = subparsers.add_parser('scroll', help='Scroll')
+    p = add_parser('scroll', help='Scroll')
     p.add_argument('amount', type=int, help='Amount (negative=down)')
     p.add_argument('--at', help='X,Y coordinates')
     p.set_defaults(func=cmd_scroll)
     
     # Keyboard
-    p = subparsers.add_parser('write', help='Write text')
+    p = add_parser('write', help='Write text')
     p.add_argument('text', help='Text to write')
     p.set_defaults(func=cmd_write)
     
-    p = subparsers.add_parser('press', help='Press key')
+    p = add_parser('press', help='Press key')
     p.add_argument('key', help='Key')
     p.set_defaults(func=cmd_press)
     
-    p = subparsers.add_parser('hotkey', help='Key combination')
+    p = add_parser('hotkey', help='Key combination')
     p.add_argument('keys', nargs='+', help='Keys')
     p.set_defaults(func=cmd_hotkey)
     
     # Utilidades
-    p = subparsers.add_parser('mouse-pos', help='Mouse position')
+    p = add_parser('mouse-pos', help='Mouse position')
     p.set_defaults(func=cmd_mouse_pos)
     
-    p = subparsers.add_parser('wait', help='Wait')
+    p = add_parser('wait', help='Wait')
     p.add_argument('seconds', type=float)
     p.set_defaults(func=cmd_wait)
     
-    p = subparsers.add_parser('screenshot', help='Screenshot')
+    p = add_parser('screenshot', help='Screenshot')
     p.add_argument('filename', help='Filename')
     p.set_defaults(func=cmd_screenshot)
     
-    p = subparsers.add_parser('region-capture', help='Interactive region capture with mouse')
+    p = add_parser('region-capture', help='Interactive region capture with mouse')
     p.set_defaults(func=cmd_region_capture)
     
     # Execute JSON
-    p = subparsers.add_parser('run', help='Execute actions from JSON')
+    p = add_parser('run', help='Execute actions from JSON')
     p.add_argument('json_str', help='JSON with actions')
     p.set_defaults(func=cmd_run)
     
     # Sequences
-    p = subparsers.add_parser('seq-create', help='Create sequence')
+    p = add_parser('seq-create', help='Create sequence')
     p.add_argument('name', help='Internal sequence name (no spaces)')
     p.add_argument('--display-name', '-n', dest='display_name', help='Friendly display name')
     p.add_argument('--description', '-d', help='Description of what the sequence does')
     p.set_defaults(func=cmd_seq_create)
     
-    p = subparsers.add_parser('seq-add', help='Add action to sequence')
+    p = add_parser('seq-add', help='Add action to sequence')
     p.add_argument('name', help='Sequence name')
     p.add_argument('action', help='Action (e.g. "click-on save_button" or "if-visible element")')
     p.add_argument('--then', dest='then_actions', action='append', help='Actions if condition is true (for if-visible)')
     p.add_argument('--else', dest='else_actions', action='append', help='Actions if condition is false (for if-visible)')
     p.set_defaults(func=cmd_seq_add)
     
-    p = subparsers.add_parser('seq-show', help='Show sequence')
+    p = add_parser('seq-add-many', help='Add actions (one per line) to sequence')
+    p.add_argument('name', help='Sequence name')
+    p.add_argument('file', nargs='?', default='-', help='File with one action per line (default: stdin)')
+    p.set_defaults(func=cmd_seq_add_many)
+    
+    p = add_parser('seq-show', help='Show sequence')
     p.add_argument('name', help='Sequence name')
     p.set_defaults(func=cmd_seq_show)
     
-    p = subparsers.add_parser('seq-run', help='Run sequence')
+    p = add_parser('seq-run', help='Run sequence')
     p.add_argument('name', help='Sequence name')
     p.set_defaults(func=cmd_seq_run)
     
-    p = subparsers.add_parser('seq-list', help='List sequences')
+    p = add_parser('seq-list', help='List sequences')
     p.set_defaults(func=cmd_seq_list)
     
-    p = subparsers.add_parser('seq-delete', help='Delete sequence')
+    p = add_parser('seq-delete', help='Delete sequence')
     p.add_argument('name', help='Sequence name')
     p.set_defaults(func=cmd_seq_delete)
     
-    p = subparsers.add_parser('seq-describe', help='Update sequence name/description')
+    p = add_parser('seq-describe', help='Update sequence name/description')
     p.add_argument('name', help='Internal sequence name')
     p.add_argument('--display-name', '-n', dest='display_name', help='New display name')
     p.add_argument('--description', '-d', help='New description')
     p.set_defaults(func=cmd_seq_describe)
     
     # Elements (JSON)
-    p = subparsers.add_parser('elem-add', help='Add/update element')
+    p = add_parser('elem-add', help='Add/update element')
     p.add_argument('name', help='Element name')
     p.add_argument('--description', '-d', help='Description')
     p.add_argument('--tags', '-t', help='Comma-separated tags')
     p.set_defaults(func=cmd_elem_add)
     
-    p = subparsers.add_parser('elem-add-image', help='Add image to element')
+    p = add_parser('elem-add-image', help='Add image to element')
     p.add_argument('name', help='Element name')
     p.add_argument('image', help='Image filename')
     p.set_defaults(func=cmd_elem_add_image)
     
-    p = subparsers.add_parser('elem-show', help='Show element')
+    p = add_parser('elem-show', help='Show element')
     p.add_argument('name', help='Element name')
     p.set_defaults(func=cmd_elem_show)
     
-    p = subparsers.add_parser('elem-list', help='List elements')
+    p = add_parser('elem-list', help='List elements')
     p.set_defaults(func=cmd_elem_list)
     
-    p = subparsers.add_parser('elem-delete', help='Delete element')
+    p = add_parser('elem-delete', help='Delete element')
     p.add_argument('name', help='Element name')
     p.set_defaults(func=cmd_elem_delete)
     
     # Sounds
-    p = subparsers.add_parser('sounds-on', help='Enable sounds')
+    p = add_parser('sounds-on', help='Enable sounds')
     p.set_defaults(func=cmd_sounds_on)
     
-    p = subparsers.add_parser('sounds-off', help='Disable sounds')
+    p = add_parser('sounds-off', help='Disable sounds')
     p.set_defaults(func=cmd_sounds_off)
     
-    p = subparsers.add_parser('sounds-status', help='Sound status')
+    p = add_parser('sounds-status', help='Sound status')
     p.set_defaults(func=cmd_sounds_status)
     
-    p = subparsers.add_parser('sounds-volume', help='Adjust volume')
+    p = add_parser('sounds-volume', help='Adjust volume')
     p.add_argument('volume', type=float, help='Volume 0.0-1.0')
     p.set_defaults(func=cmd_sounds_volume)
     
-    args = parser.parse_args()
-    
+    return parser, subparsers.choices
+
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else None
+    parser, built = _build_parser(cmd)
+    args, extra = parser.parse_known_args() if cmd in built else (None, True)
+    if extra:
+        # --help, an unknown command or stray arguments: build everything so usage and
+        # errors show the full command list
+        parser, _ = _build_parser()
+        args = parser.parse_args()
+    
+    global _compact_output
+    _compact_output = args.compact
     if args.command is None:
         parser.print_help()
         sys.exit(0)